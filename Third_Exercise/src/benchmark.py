@@ -0,0 +1,191 @@
+import argparse
+import json
+import sys
+import pandas as pd
+from serve import BUSCA_CONFIG_FILE, load_search_engine
+from vetorial_model.benchmark.batch_benchmark import BatchBenchmark
+from vetorial_model.benchmark.normalizer_benchmark import NormalizerBenchmark
+from vetorial_model.benchmark.pipeline_benchmark import PipelineBenchmark
+from vetorial_model.benchmark.pruning_benchmark import PruningBenchmark
+from vetorial_model.benchmark.quality_benchmark import QualityBenchmark
+from vetorial_model.benchmark.stemmer_benchmark import StemmerBenchmark
+from vetorial_model.processor.reader.configuration_reader import ConfigurationReader
+
+VOCABULARY_FILE = "./Results/invertida_nostemmer.csv"
+INVERT_LIST_CONFIG_FILE = "./Configs/GLI.CFG"
+CONSULT_PROCESSOR_CONFIG_FILE = "./Configs/PC.CFG"
+CONFIGS_DIRECTORY = "./Configs"
+DATA_DIRECTORY = "./Data"
+PIPELINE_BASELINE_FILE = "./Benchmarks/pipeline_baseline.json"
+
+
+def run_stemmer_benchmark(arguments: argparse.Namespace) -> bool:
+    """Check the fast stemmer against the original one and time both
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments
+
+    Returns:
+        bool: If the check passed
+    """
+    return StemmerBenchmark(arguments.vocabulary).run(arguments.repeat)
+
+
+def run_normalizer_benchmark(arguments: argparse.Namespace) -> bool:
+    """Check the single pass normalization against the chain and time both
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments
+
+    Returns:
+        bool: If the check passed
+    """
+    configuration = ConfigurationReader(arguments.config)
+    return NormalizerBenchmark(configuration.read).run(arguments.repeat)
+
+
+def run_pruning_benchmark(arguments: argparse.Namespace) -> bool:
+    """Check the MaxScore top k against the exhaustive one and time both
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments
+
+    Returns:
+        bool: If the check passed
+    """
+    search_engine = load_search_engine(arguments.model)
+    search_engine.read_queries_and_generate_query_token_dictionary(
+        ConfigurationReader(BUSCA_CONFIG_FILE).queries[0]
+    )
+    return PruningBenchmark(search_engine, arguments.top_k).run(arguments.repeat)
+
+
+def run_batch_benchmark(arguments: argparse.Namespace) -> bool:
+    """Check the batch search against the search of one query at a time
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments
+
+    Returns:
+        bool: If the check passed
+    """
+    search_engine = load_search_engine(arguments.model)
+    search_engine.read_queries_and_generate_query_token_dictionary(
+        ConfigurationReader(BUSCA_CONFIG_FILE).queries[0]
+    )
+    return BatchBenchmark(search_engine, arguments.top_k).run(arguments.repeat)
+
+
+def run_quality_benchmark(arguments: argparse.Namespace) -> bool:
+    """Compare the ranking metrics and the time of the top k settings
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments
+
+    Returns:
+        bool: If the check passed
+    """
+    search_engine = load_search_engine(arguments.model)
+    search_engine.read_queries_and_generate_query_token_dictionary(
+        ConfigurationReader(BUSCA_CONFIG_FILE).queries[0]
+    )
+    expected_results = pd.read_csv(
+        ConfigurationReader(CONSULT_PROCESSOR_CONFIG_FILE).expected[0], sep=";"
+    )
+    return QualityBenchmark(search_engine, expected_results, arguments.top_k).run()
+
+
+def run_pipeline_benchmark(arguments: argparse.Namespace) -> bool:
+    """Time every stage of main.py on each scale and compare with the baseline
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments
+
+    Returns:
+        bool: If no stage failed or regressed
+    """
+    pipeline_benchmark = PipelineBenchmark(
+        arguments.configs, arguments.data, arguments.scales, arguments.timeout
+    )
+    passed, measures = pipeline_benchmark.run(
+        arguments.baseline, arguments.tolerance, arguments.save_baseline
+    )
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(measures, file, indent=2)
+            file.write("\n")
+    return passed
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse the command line arguments
+
+    Returns:
+        argparse.Namespace: The command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks of the vetorial model")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    stemmer_parser = subparsers.add_parser(
+        "stemmer", help="Compare the fast Porter stemmer with the original one"
+    )
+    stemmer_parser.add_argument("--vocabulary", default=VOCABULARY_FILE)
+    stemmer_parser.add_argument("--repeat", type=int, default=5)
+    stemmer_parser.set_defaults(run=run_stemmer_benchmark)
+
+    normalizer_parser = subparsers.add_parser(
+        "normalizer", help="Compare the single pass normalization with the chain"
+    )
+    normalizer_parser.add_argument("--config", default=INVERT_LIST_CONFIG_FILE)
+    normalizer_parser.add_argument("--repeat", type=int, default=5)
+    normalizer_parser.set_defaults(run=run_normalizer_benchmark)
+
+    pruning_parser = subparsers.add_parser(
+        "pruning", help="Compare the MaxScore top k with the exhaustive evaluation"
+    )
+    pruning_parser.add_argument("--model", help="Default: MODELO of BUSCA.CFG")
+    pruning_parser.add_argument("--top-k", type=int, default=10)
+    pruning_parser.add_argument("--repeat", type=int, default=5)
+    pruning_parser.set_defaults(run=run_pruning_benchmark)
+
+    batch_parser = subparsers.add_parser(
+        "batch", help="Compare the batch search with one query at a time"
+    )
+    batch_parser.add_argument("--model", help="Default: MODELO of BUSCA.CFG")
+    batch_parser.add_argument("--top-k", type=int, help="Default: every document")
+    batch_parser.add_argument("--repeat", type=int, default=5)
+    batch_parser.set_defaults(run=run_batch_benchmark)
+
+    quality_parser = subparsers.add_parser(
+        "quality", help="Compare the ranking metrics of the top k settings"
+    )
+    quality_parser.add_argument("--model", help="Default: MODELO of BUSCA.CFG")
+    quality_parser.add_argument("--top-k", type=int, nargs="+", default=[10, 100])
+    quality_parser.set_defaults(run=run_quality_benchmark)
+
+    pipeline_parser = subparsers.add_parser(
+        "pipeline", help="Time every stage of main.py on the scaled up collection"
+    )
+    pipeline_parser.add_argument("--configs", default=CONFIGS_DIRECTORY)
+    pipeline_parser.add_argument("--data", default=DATA_DIRECTORY)
+    pipeline_parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    pipeline_parser.add_argument("--baseline", default=PIPELINE_BASELINE_FILE)
+    pipeline_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="The allowed increase over the baseline, as a fraction of it",
+    )
+    pipeline_parser.add_argument(
+        "--save-baseline", action="store_true", help="Replace the baseline"
+    )
+    pipeline_parser.add_argument("--timeout", type=float, help="Seconds per stage")
+    pipeline_parser.add_argument("--output", help="A json file for the measures")
+    pipeline_parser.set_defaults(run=run_pipeline_benchmark)
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    sys.exit(0 if arguments.run(arguments) else 1)
@@ -0,0 +1,109 @@
+import argparse
+import os
+import shutil
+from typing import List
+from vetorial_model.processor.generator.synthetic_corpus_generator import (
+    SyntheticCorpusGenerator,
+)
+
+VOCABULARY_FILE = "./Results/invertida_nostemmer.csv"
+CONFIGS_DIRECTORY = "./Configs"
+DATA_DIRECTORY = "./Data"
+SCHEMA_FILES = ["cfc-2.dtd", "cfcquery-2.dtd"]
+INVERT_LIST_CONFIG_FILE = "GLI.CFG"
+CONSULT_PROCESSOR_CONFIG_FILE = "PC.CFG"
+
+
+def write_configuration(source_path: str, destination_path: str, files: List[str]):
+    """Copy a configuration file with other LEIA files
+
+    Args:
+        source_path (str): The configuration file
+        destination_path (str): The copy
+        files (List[str]): The LEIA files, in place of the ones of the source
+    """
+    with open(source_path, "r", encoding="utf-8") as file:
+        lines = file.read().splitlines()
+    read_lines = [f"LEIA={file_path}" for file_path in files]
+    first_read = next(
+        (index for index, line in enumerate(lines) if line.startswith("LEIA=")),
+        len(lines),
+    )
+    lines = [line for line in lines if not line.startswith("LEIA=")]
+    lines[first_read:first_read] = read_lines
+    with open(destination_path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines))
+
+
+def generate_workspace(arguments: argparse.Namespace):
+    """Write a synthetic collection with its queries and the configurations to run it
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments
+    """
+    data_directory = os.path.join(arguments.output, "Data")
+    configs_directory = os.path.join(arguments.output, "Configs")
+    for directory in (data_directory, configs_directory):
+        os.makedirs(directory, exist_ok=True)
+    for directory in ("Results", "Avalia"):
+        os.makedirs(os.path.join(arguments.output, directory), exist_ok=True)
+
+    generator = SyntheticCorpusGenerator(
+        arguments.vocabulary, arguments.seed, arguments.exponent
+    )
+    collection_paths, queries_path = generator.generate(
+        data_directory, arguments.documents, arguments.queries, arguments.records_per_file
+    )
+    for schema_file in SCHEMA_FILES:
+        shutil.copyfile(
+            os.path.join(DATA_DIRECTORY, schema_file),
+            os.path.join(data_directory, schema_file),
+        )
+
+    def relative_paths(paths: List[str]) -> List[str]:
+        return [os.path.relpath(path, arguments.output) for path in paths]
+
+    for file_name in os.listdir(CONFIGS_DIRECTORY):
+        source_path = os.path.join(CONFIGS_DIRECTORY, file_name)
+        destination_path = os.path.join(configs_directory, file_name)
+        if file_name == INVERT_LIST_CONFIG_FILE:
+            write_configuration(
+                source_path, destination_path, relative_paths(collection_paths)
+            )
+        elif file_name == CONSULT_PROCESSOR_CONFIG_FILE:
+            write_configuration(
+                source_path, destination_path, relative_paths([queries_path])
+            )
+        else:
+            shutil.copyfile(source_path, destination_path)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse the command line arguments
+
+    Returns:
+        argparse.Namespace: The command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic collection in the schema of the CF collection"
+    )
+    parser.add_argument(
+        "output", help="The directory the Data, Configs, Results and Avalia go to"
+    )
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--records-per-file", type=int, default=10000)
+    parser.add_argument(
+        "--vocabulary",
+        default=VOCABULARY_FILE,
+        help="The csv inverted list the term statistics are read from",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--exponent", type=float, default=1.0, help="The exponent of the Zipf law"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    generate_workspace(parse_arguments())
@@ -1,5 +1,5 @@
+from concurrent.futures import ProcessPoolExecutor
 from typing import List
-from vetorial_model.indexer.indexer import Indexer
 from vetorial_model.processor.generator import (
     inverted_list_generator as ilg,
     queries_generator as qg,
@@ -12,7 +12,7 @@ from vetorial_model.processor.reader import (
     inverted_list_reader,
 )
 from vetorial_model.search_engine.engine import SearchEngine
-from vetorial_model.validator.validator import Validator
+from vetorial_model.utils.shared import get_stemmer_file_path
 
 CONSULT_PROCESSOR_CONFIG_FILE = "./Configs/PC.CFG"
 INVERT_LIST_CONFIG_FILE = "./Configs/GLI.CFG"
@@ -34,8 +34,7 @@ def generate_consultas_and_esperados_data():
     queries_generator = qg.QueriesGenerator(configuration.queries[0])
     expected_generator = eg.ExpectedGenerator(configuration.expected[0])
 
-    queries = data.get_tag_elements("QUERY")
-    for query in queries:
+    for query in data.iter_tag_elements("QUERY"):
         last_query_number, query_text = queries_generator.build_csv_row(data, query)
         queries_normalized_data.append(f"{last_query_number};{query_text}")
         waited_queries += expected_generator.build_csv_row(
@@ -51,24 +50,46 @@ def generate_inverted_list_data():
     inverted_list_configuration = configuration_reader.ConfigurationReader(
         INVERT_LIST_CONFIG_FILE
     )
-
-    generator = ilg.InvertedListGenerator(
-        inverted_list_configuration.write[0], inverted_list_configuration.stemmer
+    # Every stage gets the flag, so NOSTEMMER turns off the stemming of the queries too
+    stemmer = inverted_list_configuration.define_stemmer(
+        inverted_list_configuration.stemmer
     )
+
+    generator = ilg.InvertedListGenerator(inverted_list_configuration.write[0], stemmer)
     reader = inverted_list_reader.InvertedListReader(inverted_list_configuration.read)
-    inverted_rows = []
-    for file in reader.files:
-        reader.set_file_path(file)
-        records = reader.get_tag_elements("RECORD")
-        for record in records:
-            inverted_rows += generator.build_csv_row(reader, record)
+    memory_budget = next(iter(inverted_list_configuration.memory_budget), None)
+    if memory_budget:
+        rows = generator.build_inverted_list_with_runs(reader.files, int(memory_budget))
+        if generator.binary:
+            generator.write_binary_rows_to_file_path(rows)
+        else:
+            generator.write_rows_to_file_path(rows)
+        return generator.last_document, stemmer
+
+    processes = int(next(iter(inverted_list_configuration.processes), 1))
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            partial_inverted_lists = list(
+                executor.map(generator.build_file_inverted_list, reader.files)
+            )
+    else:
+        partial_inverted_lists = [
+            generator.build_file_inverted_list(file) for file in reader.files
+        ]
 
-    generator.write_dictionary_to_file_path(generator.group_by_word(inverted_rows))
-    return generator.last_document, inverted_list_configuration.stemmer
+    grouped_rows = generator.merge_grouped_rows(partial_inverted_lists)
+    if generator.binary:
+        generator.write_binary_index_to_file_path(grouped_rows)
+    else:
+        generator.write_dictionary_to_file_path(grouped_rows)
+    return generator.last_document, stemmer
 
 
 def generate_indexer(last_document: str, stemmer: bool):
     """Generate the model"""
+    # pandas and scipy are only imported by the stages that need them
+    from vetorial_model.indexer.indexer import Indexer
+
     indexer_configuration = configuration_reader.ConfigurationReader(
         INDEXER_CONFIG_FILE
     )
@@ -79,8 +100,13 @@ def generate_indexer(last_document: str, stemmer: bool):
         last_document,
         indexer_configuration.write[0],
     )
-    terms_dataframe = indexer.calculate_dataframe_tfidf()
-    indexer.write_dataframe_to_file_path(terms_dataframe)
+    tfidf_matrix = indexer.calculate_sparse_tfidf()
+    indexer.write_dataframe_to_file_path(
+        indexer.convert_sparse_tfidf_to_dataframe(tfidf_matrix)
+    )
+    indexer.write_document_norms_to_file_path(
+        indexer.calculate_document_norms(tfidf_matrix)
+    )
     return indexer.list_of_documents
 
 
@@ -88,28 +114,29 @@ def search_documents(documents_list: List[str], stemmer: bool):
     """Search documents"""
     search_configuration = configuration_reader.ConfigurationReader(BUSCA_CONFIG_FILE)
 
-    search_engine = SearchEngine(documents_list)
-    if stemmer:
-        model_path = search_configuration.model[0].replace(".csv", "_stemmer.csv")
-        results_path = search_configuration.results[0].replace(".csv", "_stemmer.csv")
-    else:
-        model_path = search_configuration.model[0].replace(".csv", "_nostemmer.csv")
-        results_path = search_configuration.results[0].replace(".csv", "_nostemmer.csv")
+    search_engine = SearchEngine(documents_list, stemmer)
+    model_path = get_stemmer_file_path(search_configuration.model[0], stemmer)
+    results_path = get_stemmer_file_path(search_configuration.results[0], stemmer)
 
-    search_engine.read_tf_idf_table_and_generate_term_value_dictionary(model_path)
+    if model_path.endswith(".bin"):
+        search_engine.read_binary_index_and_generate_postings(model_path)
+    else:
+        search_engine.read_tf_idf_table_and_generate_term_value_dictionary(model_path)
     search_engine.read_queries_and_generate_query_token_dictionary(
         search_configuration.queries[0]
     )
 
-    result = search_engine.search_documents()
-    search_engine.write_search_result(result, results_path)
+    top_k = next(iter(search_configuration.top_k), None)
+    search_engine.write_search_result(
+        search_engine.iter_search_documents(int(top_k) if top_k else None),
+        results_path,
+    )
     return results_path
 
-if __name__ == "__main__":
-    generate_consultas_and_esperados_data()
-    number_of_documents, stemmer = generate_inverted_list_data()
-    list_of_documents = generate_indexer(number_of_documents, stemmer)
-    results_path = search_documents(list_of_documents, stemmer)
+
+def validate_search_results(results_path: str, stemmer: bool):
+    """Validate the search results"""
+    from vetorial_model.validator.validator import Validator
 
     validator = Validator(
         results_path=results_path,
@@ -118,3 +145,11 @@ if __name__ == "__main__":
     )
 
     validator.validate()
+
+
+if __name__ == "__main__":
+    generate_consultas_and_esperados_data()
+    number_of_documents, stemmer = generate_inverted_list_data()
+    list_of_documents = generate_indexer(number_of_documents, stemmer)
+    results_path = search_documents(list_of_documents, stemmer)
+    validate_search_results(results_path, stemmer)
@@ -0,0 +1,143 @@
+import argparse
+import os
+import threading
+import time
+from typing import Optional, Tuple
+from vetorial_model.indexer.segmented_index import SegmentedIndex
+from vetorial_model.processor.reader.configuration_reader import ConfigurationReader
+from vetorial_model.search_engine.engine import SearchEngine
+from vetorial_model.search_engine.server import SearchServer
+from vetorial_model.utils.shared import get_stemmer_file_path
+
+INVERT_LIST_CONFIG_FILE = "./Configs/GLI.CFG"
+BUSCA_CONFIG_FILE = "./Configs/BUSCA.CFG"
+
+
+def read_model_path(model_path: Optional[str] = None) -> Tuple[str, bool]:
+    """Read the model path and the stemmer flag from the configurations
+
+    Args:
+        model_path (Optional[str]): The path of the model. Default: None, which
+            uses the MODELO of the search configuration
+
+    Returns:
+        Tuple[str, bool]: The model path and if the stemmer is used
+    """
+    inverted_list_configuration = ConfigurationReader(INVERT_LIST_CONFIG_FILE)
+    stemmer = inverted_list_configuration.define_stemmer(
+        inverted_list_configuration.stemmer
+    )
+    if model_path is None:
+        search_configuration = ConfigurationReader(BUSCA_CONFIG_FILE)
+        model_path = get_stemmer_file_path(search_configuration.model[0], stemmer)
+    return model_path, stemmer
+
+
+def load_segmented_search_engine(segmented_index: SegmentedIndex) -> SearchEngine:
+    """Load the live documents of a segmented index into a search engine
+
+    Args:
+        segmented_index (SegmentedIndex): The segmented index
+
+    Returns:
+        SearchEngine: The search engine
+    """
+    search_engine = SearchEngine([], segmented_index.stemmer)
+    search_engine.read_segmented_index_and_generate_postings(segmented_index)
+    return search_engine
+
+
+def load_search_engine(model_path: Optional[str] = None) -> SearchEngine:
+    """Load the model generated by main.py into a search engine
+
+    Args:
+        model_path (Optional[str]): The path of the model, or the directory of a
+            segmented index. Default: None, which uses the MODELO of the search
+            configuration
+
+    Returns:
+        SearchEngine: The search engine
+    """
+    model_path, stemmer = read_model_path(model_path)
+    if os.path.isdir(model_path):
+        return load_segmented_search_engine(SegmentedIndex(model_path, stemmer))
+
+    search_engine = SearchEngine([], stemmer)
+    if model_path.endswith(".bin"):
+        search_engine.read_binary_index_and_generate_postings(model_path, lazy=True)
+    else:
+        search_engine.read_tf_idf_table_and_generate_term_value_dictionary(model_path)
+    return search_engine
+
+
+def reload_when_changed(
+    server: SearchServer, segmented_index: SegmentedIndex, interval: float
+):
+    """Swap the search engine of the server whenever update.py changes the segments
+
+    The requests being answered keep the previous search engine.
+
+    Args:
+        server (SearchServer): The server
+        segmented_index (SegmentedIndex): The segmented index served
+        interval (float): The seconds between the checks
+    """
+
+    def reload():
+        while True:
+            time.sleep(interval)
+            if segmented_index.refresh():
+                server.search_engine = load_segmented_search_engine(segmented_index)
+                server.logger.info("Segmented index reloaded")
+
+    threading.Thread(target=reload, name="SegmentReload", daemon=True).start()
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse the command line arguments
+
+    Returns:
+        argparse.Namespace: The command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Serve the vetorial model over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--model", help="The model path. Default: MODELO of BUSCA.CFG")
+    parser.add_argument(
+        "--pruning", action="store_true", help="Select the top k with MaxScore"
+    )
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=0.0,
+        help="The seconds between the checks for changes of a segmented index. "
+        "Default: 0, never reloads",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    model_path, stemmer = read_model_path(arguments.model)
+    segmented_index = None
+    if arguments.reload_interval > 0 and os.path.isdir(model_path):
+        segmented_index = SegmentedIndex(model_path, stemmer)
+        search_engine = load_segmented_search_engine(segmented_index)
+    else:
+        search_engine = load_search_engine(model_path)
+    server = SearchServer(
+        (arguments.host, arguments.port),
+        search_engine,
+        arguments.top_k,
+        arguments.pruning,
+    )
+    if segmented_index is not None:
+        reload_when_changed(server, segmented_index, arguments.reload_interval)
+    server.logger.info(f"Serving on http://{arguments.host}:{arguments.port}/search")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.logger.info("Stopping")
+    finally:
+        server.server_close()
@@ -0,0 +1,120 @@
+import argparse
+import time
+from vetorial_model.indexer.segmented_index import SegmentedIndex
+from vetorial_model.processor.reader.configuration_reader import ConfigurationReader
+from vetorial_model.utils.shared import get_stemmer_file_path
+
+INVERT_LIST_CONFIG_FILE = "./Configs/GLI.CFG"
+SEGMENTS_DIRECTORY = "./Results/segmentos"
+
+
+def open_segmented_index(directory: str) -> SegmentedIndex:
+    """Open the segmented index with the stemmer of the inverted list configuration
+
+    Args:
+        directory (str): The directory of the segments
+
+    Returns:
+        SegmentedIndex: The segmented index
+    """
+    inverted_list_configuration = ConfigurationReader(INVERT_LIST_CONFIG_FILE)
+    stemmer = inverted_list_configuration.define_stemmer(
+        inverted_list_configuration.stemmer
+    )
+    return SegmentedIndex(get_stemmer_file_path(directory, stemmer), stemmer)
+
+
+def add_files(arguments: argparse.Namespace):
+    """Add each collection file as a new segment
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments
+    """
+    segmented_index = open_segmented_index(arguments.directory)
+    for file in arguments.files:
+        segmented_index.add_file(file)
+
+
+def delete_documents(arguments: argparse.Namespace):
+    """Tombstone the records
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments
+    """
+    open_segmented_index(arguments.directory).delete_documents(arguments.records)
+
+
+def merge_segments(arguments: argparse.Namespace):
+    """Compact the segments into one, or keep compacting them in the background
+    while other update.py runs add and delete records
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments
+    """
+    segmented_index = open_segmented_index(arguments.directory)
+    if not arguments.background:
+        segmented_index.merge_segments()
+        return
+
+    segmented_index.start_background_merge(arguments.max_segments, arguments.interval)
+    segmented_index.logger.info("Merging in the background, stop with Ctrl+C")
+    try:
+        while True:
+            time.sleep(arguments.interval)
+    except KeyboardInterrupt:
+        segmented_index.logger.info("Stopping")
+    finally:
+        segmented_index.stop_background_merge()
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse the command line arguments
+
+    Returns:
+        argparse.Namespace: The command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Add and delete records without rebuilding the model"
+    )
+    parser.add_argument(
+        "--directory",
+        default=SEGMENTS_DIRECTORY,
+        help="The directory of the segments, suffixed as the other results",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = subparsers.add_parser(
+        "add", help="Add collection files as new segments"
+    )
+    add_parser.add_argument("files", nargs="+")
+    add_parser.set_defaults(run=add_files)
+
+    delete_parser = subparsers.add_parser("delete", help="Delete records by RECORDNUM")
+    delete_parser.add_argument("records", nargs="+")
+    delete_parser.set_defaults(run=delete_documents)
+
+    merge_parser = subparsers.add_parser("merge", help="Compact the segments into one")
+    merge_parser.add_argument(
+        "--background",
+        action="store_true",
+        help="Keep running, merging whenever the segments need it",
+    )
+    merge_parser.add_argument(
+        "--max-segments",
+        type=int,
+        default=4,
+        help="The number of segments kept without a background merge",
+    )
+    merge_parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="The seconds between the checks of the background merge",
+    )
+    merge_parser.set_defaults(run=merge_segments)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    arguments.run(arguments)
@@ -0,0 +1,90 @@
+import logging
+import timeit
+from typing import List, Optional, Tuple
+from vetorial_model.search_engine.engine import SearchEngine
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+
+
+class BatchBenchmark:
+    """Initialize the BatchBenchmark
+
+    Compares the batch search, a single sparse matrix product for every query,
+    against the search of one query at a time.
+
+    Args:
+        search_engine (SearchEngine): The search engine with the model and the
+            queries read.
+        top_k (Optional[int]): How many documents are kept for each query.
+            Default: None, which keeps every document
+    """
+
+    def __init__(self, search_engine: SearchEngine, top_k: Optional[int] = None):
+        self.logger = get_logger_with_date_output("BatchBenchmark")
+        self.search_engine = search_engine
+        self.search_engine.logger.setLevel(logging.WARNING)
+        self.top_k = top_k
+
+    def find_mismatches(self) -> List[str]:
+        """Search every query both ways
+
+        Returns:
+            List[str]: The queries with a different result
+        """
+        search_result = self.search_engine.search_documents(self.top_k)
+        batch_result = self.search_engine.search_documents_batch(self.top_k)
+        return [
+            query
+            for query in search_result
+            if repr(search_result[query]) != repr(batch_result.get(query))
+        ]
+
+    def measure(self, repeat: int = 5) -> Tuple[float, float]:
+        """Measure the time to search every query each way
+
+        Args:
+            repeat (int): How many times the queries are searched. Default: 5
+
+        Returns:
+            Tuple[float, float]: The best time of the query at a time and of the
+                batch search
+        """
+        single = min(
+            timeit.repeat(
+                lambda: self.search_engine.search_documents(self.top_k),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        batch = min(
+            timeit.repeat(
+                lambda: self.search_engine.search_documents_batch(self.top_k),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        return single, batch
+
+    def run(self, repeat: int = 5) -> bool:
+        """Check the batch search and log the speedup
+
+        Args:
+            repeat (int): How many times the queries are searched. Default: 5
+
+        Returns:
+            bool: If both ways gave the same result for every query
+        """
+        mismatches = self.find_mismatches()
+        if mismatches:
+            self.logger.error(
+                f"{len(mismatches)} queries with a different result, "
+                f"the first one is {mismatches[0]}"
+            )
+            return False
+        self.logger.info("Every query has the same result")
+
+        single, batch = self.measure(repeat)
+        self.logger.info(
+            f"One query at a time: {single:.3f}s, batch: {batch:.3f}s, "
+            f"speedup {single / batch:.2f}x"
+        )
+        return True
@@ -0,0 +1,100 @@
+import logging
+import timeit
+from typing import List, Tuple
+from vetorial_model.processor.reader.data_reader import DataReader
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+from vetorial_model.utils.normalizer_utils import Normalize
+
+
+class NormalizerBenchmark:
+    """Initialize the NormalizerBenchmark
+
+    Compares the single pass normalization against the chain of replacements
+    on the abstracts of the collection.
+
+    Args:
+        file_paths (List[str]): The paths of the xml files of the collection.
+    """
+
+    def __init__(self, file_paths: List[str]):
+        self.logger = get_logger_with_date_output("NormalizerBenchmark")
+        self.file_paths = file_paths
+        self.texts = self.__read_abstracts()
+
+    def __read_abstracts(self) -> List[str]:
+        """Read the abstracts, or the extracts, of every record
+
+        Returns:
+            List[str]: The texts
+        """
+        texts = []
+        for file_path in self.file_paths:
+            reader = DataReader(file_path)
+            reader.logger.setLevel(logging.WARNING)
+            for tag_name in ("ABSTRACT", "EXTRACT"):
+                for element in reader.iter_tag_elements(tag_name):
+                    texts.append(reader.get_tag_element_value(element))
+        self.logger.info(f"Found {len(texts)} texts")
+        return texts
+
+    def find_mismatches(self) -> List[Tuple[str, str, str]]:
+        """Normalize every text both ways
+
+        Returns:
+            List[Tuple[str, str, str]]: The text, the chain normalization and the
+                single pass normalization of every text normalized differently
+        """
+        mismatches = []
+        for text in self.texts:
+            expected = Normalize.normalize(text, fast=False)
+            normalized = Normalize.normalize(text)
+            if expected != normalized:
+                mismatches.append((text, expected, normalized))
+        return mismatches
+
+    def measure(self, repeat: int = 5) -> Tuple[float, float]:
+        """Measure the time to normalize every text both ways
+
+        Args:
+            repeat (int): How many times the texts are normalized. Default: 5
+
+        Returns:
+            Tuple[float, float]: The best time of the chain and of the single pass
+        """
+        texts = self.texts
+
+        def run_chain():
+            for text in texts:
+                Normalize.normalize(text, fast=False)
+
+        def run_single_pass():
+            for text in texts:
+                Normalize.normalize(text)
+
+        chain = min(timeit.repeat(run_chain, number=1, repeat=repeat))
+        single_pass = min(timeit.repeat(run_single_pass, number=1, repeat=repeat))
+        return chain, single_pass
+
+    def run(self, repeat: int = 5) -> bool:
+        """Check the single pass normalization and log the speedup
+
+        Args:
+            repeat (int): How many times the texts are normalized. Default: 5
+
+        Returns:
+            bool: If both ways gave the same text for every text
+        """
+        mismatches = self.find_mismatches()
+        for text, expected, normalized in mismatches[:5]:
+            self.logger.error(f"{text!r}: expected {expected!r}, got {normalized!r}")
+        if mismatches:
+            self.logger.error(f"{len(mismatches)} texts normalized differently")
+            return False
+        self.logger.info("Every text normalized like the chain of replacements")
+
+        chain, single_pass = self.measure(repeat)
+        self.logger.info(
+            f"Chain: {chain:.3f}s, single pass: {single_pass:.3f}s, "
+            f"speedup {chain / single_pass:.2f}x"
+        )
+        return True
@@ -0,0 +1,442 @@
+import json
+import os
+import platform
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from vetorial_model.processor.reader.configuration_reader import ConfigurationReader
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+
+# The stages of main.py, in order, with the count their throughput is given in
+PIPELINE_STAGES = [
+    ("queries", "generate_consultas_and_esperados_data", "queries"),
+    ("inverted_list", "generate_inverted_list_data", "documents"),
+    ("indexer", "generate_indexer", "documents"),
+    ("search", "search_documents", "queries"),
+    ("validation", "validate_search_results", "queries"),
+]
+INVERT_LIST_CONFIG_FILE = "Configs/GLI.CFG"
+CONSULT_PROCESSOR_CONFIG_FILE = "Configs/PC.CFG"
+STAGE_LOG_FILE = "pipeline.log"
+
+RECORD_PATTERN = re.compile(r"[ \t]*<RECORD>.*?</RECORD>\s*", re.DOTALL)
+RECORDNUM_PATTERN = re.compile(r"<RECORDNUM>\s*(\d+)\s*</RECORDNUM>")
+MIN_RECORDNUM_WIDTH = 5
+
+
+def get_peak_rss() -> float:
+    """Get the peak resident set size of this process and of its children
+
+    Returns:
+        float: The peak resident set size, in MiB
+    """
+    peak_rss = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in bytes on macOS and in KiB everywhere else
+    return peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def get_environment() -> Dict[str, Any]:
+    """Get what the measures depend on besides the code
+
+    Returns:
+        Dict[str, Any]: The platform, the python version and the number of cpus
+    """
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_stage(stage: str, arguments_path: str, result_path: str):
+    """Run one stage of main.py in this process and write its measures
+
+    Args:
+        stage (str): The name of the function of main.py
+        arguments_path (str): The json file with the arguments of the stage
+        result_path (str): The json file the result, the time and the peak
+            resident set size are written to
+    """
+    import main
+
+    with open(arguments_path, encoding="utf-8") as file:
+        arguments = json.load(file)
+    stage_function = getattr(main, stage)
+
+    start_time = time.perf_counter()
+    result = stage_function(*arguments)
+    seconds = time.perf_counter() - start_time
+
+    with open(result_path, "w", encoding="utf-8") as file:
+        json.dump(
+            {"result": result, "seconds": seconds, "peak_rss": get_peak_rss()}, file
+        )
+
+
+def replicate_collection_file(
+    source_path: str, destination_path: str, copies: int, offset: int, width: int
+) -> int:
+    """Write the records of a collection file several times, renumbered
+
+    Copy c of a record gets the RECORDNUM c * offset + RECORDNUM, zero padded
+    to the same width on every record so the highest RECORDNUM is still the
+    highest string. The first copy keeps the original numbers, so the
+    relevance judgments of the queries still apply.
+
+    Args:
+        source_path (str): The collection file
+        destination_path (str): The scaled collection file
+        copies (int): How many times each record is written
+        offset (int): The highest RECORDNUM of the collection
+        width (int): The width of the renumbered RECORDNUM
+
+    Returns:
+        int: The number of records written
+    """
+    with open(source_path, encoding="utf-8") as file:
+        text = file.read()
+    records = [match.group(0) for match in RECORD_PATTERN.finditer(text)]
+    if not records:
+        shutil.copyfile(source_path, destination_path)
+        return 0
+
+    header = text[: text.index(records[0])]
+    footer = text[text.rindex(records[-1]) + len(records[-1]) :]
+    # Each record is split around its RECORDNUM once, and only the number changes
+    record_parts = []
+    for record in records:
+        match = RECORDNUM_PATTERN.search(record)
+        record_parts.append(
+            (record[: match.start(1)], int(match.group(1)), record[match.end(1) :])
+        )
+
+    with open(destination_path, "w", encoding="utf-8") as file:
+        file.write(header)
+        for copy in range(copies):
+            for before, record_number, after in record_parts:
+                file.write(f"{before}{record_number + copy * offset:0{width}d}{after}")
+        file.write(footer)
+    return len(records) * copies
+
+
+class PipelineBenchmark:
+    """Initialize the PipelineBenchmark
+
+    Times every stage of main.py on the collection and on scaled up copies of
+    it, where each record is repeated with a new RECORDNUM. Each scale runs in
+    a temporary copy of the configurations and the data, and each stage in its
+    own interpreter, so the peak resident set size is the one of the stage.
+    The measures are compared with a stored baseline.
+
+    Args:
+        configs_directory (str): The directory with the configuration files
+        data_directory (str): The directory with the collection and the queries
+        scales (List[int]): How many copies of the collection are timed
+        timeout (Optional[float]): The seconds a stage may take. Default: None
+    """
+
+    def __init__(
+        self,
+        configs_directory: str,
+        data_directory: str,
+        scales: List[int],
+        timeout: Optional[float] = None,
+    ):
+        self.logger = get_logger_with_date_output("PipelineBenchmark")
+        self.configs_directory = os.path.abspath(configs_directory)
+        self.data_directory = os.path.abspath(data_directory)
+        self.scales = scales
+        self.timeout = timeout
+        self.source_directory = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+
+    def __prepare_workspace(self, workspace: str, scale: int) -> Dict[str, int]:
+        """Copy the configurations and write the collection scaled up
+
+        Args:
+            workspace (str): The directory the pipeline runs in
+            scale (int): How many copies of the collection are written
+
+        Returns:
+            Dict[str, int]: The number of documents and of queries
+        """
+        shutil.copytree(self.configs_directory, os.path.join(workspace, "Configs"))
+        data_directory = os.path.join(workspace, "Data")
+        shutil.copytree(self.data_directory, data_directory)
+        os.makedirs(os.path.join(workspace, "Results"))
+        os.makedirs(os.path.join(workspace, "Avalia"))
+
+        collection_files = [
+            os.path.join(workspace, file_path)
+            for file_path in ConfigurationReader(
+                os.path.join(workspace, INVERT_LIST_CONFIG_FILE)
+            ).read
+        ]
+        collection_texts = []
+        for file_path in collection_files:
+            with open(file_path, encoding="utf-8") as file:
+                collection_texts.append(file.read())
+        offset = max(
+            int(record_number)
+            for text in collection_texts
+            for record_number in RECORDNUM_PATTERN.findall(text)
+        )
+        width = max(MIN_RECORDNUM_WIDTH, len(str(offset * scale)))
+
+        documents = 0
+        for file_path in collection_files:
+            documents += replicate_collection_file(
+                file_path, file_path, scale, offset, width
+            )
+
+        queries = 0
+        for file_path in ConfigurationReader(
+            os.path.join(workspace, CONSULT_PROCESSOR_CONFIG_FILE)
+        ).read:
+            with open(os.path.join(workspace, file_path), encoding="utf-8") as file:
+                queries += file.read().count("<QUERY>")
+        return {"documents": documents, "queries": queries}
+
+    def __run_stage_process(
+        self, workspace: str, stage: str, arguments: List[Any]
+    ) -> Dict[str, Any]:
+        """Run a stage of main.py in a new interpreter inside the workspace
+
+        Args:
+            workspace (str): The directory the pipeline runs in
+            stage (str): The name of the function of main.py
+            arguments (List[Any]): The arguments of the stage
+
+        Returns:
+            Dict[str, Any]: The result, the seconds and the peak_rss of the stage
+        """
+        arguments_path = os.path.join(workspace, "arguments.json")
+        result_path = os.path.join(workspace, "result.json")
+        with open(arguments_path, "w", encoding="utf-8") as file:
+            json.dump(arguments, file)
+
+        environment = dict(os.environ)
+        environment["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [self.source_directory, environment.get("PYTHONPATH")])
+        )
+        with open(os.path.join(workspace, STAGE_LOG_FILE), "ab") as log:
+            subprocess.run(
+                [sys.executable, "-m", __name__, stage, arguments_path, result_path],
+                cwd=workspace,
+                env=environment,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                timeout=self.timeout,
+                check=True,
+            )
+        with open(result_path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def measure_scale(self, scale: int) -> Dict[str, Any]:
+        """Run the whole pipeline on the collection scaled up
+
+        A stage that fails or times out is recorded without measures, and the
+        stages after it are not run.
+
+        Args:
+            scale (int): How many copies of the collection are used
+
+        Returns:
+            Dict[str, Any]: The number of documents and of queries, and the
+                seconds, throughput and peak_rss_mib of each stage
+        """
+        with tempfile.TemporaryDirectory(prefix="pipeline_benchmark_") as workspace:
+            counts = self.__prepare_workspace(workspace, scale)
+            self.logger.info(
+                f"{scale}x: {counts['documents']} documents, {counts['queries']} queries"
+            )
+            measures: Dict[str, Any] = {**counts, "stages": {}}
+
+            outputs: Dict[str, Any] = {}
+            for name, stage, unit in PIPELINE_STAGES:
+                arguments = self.__get_stage_arguments(name, outputs)
+                try:
+                    stage_result = self.__run_stage_process(workspace, stage, arguments)
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as error:
+                    self.logger.error(f"{scale}x {name} failed: {error}")
+                    self.__log_stage_output(workspace)
+                    measures["stages"][name] = {"failed": True}
+                    break
+
+                outputs[name] = stage_result["result"]
+                seconds = stage_result["seconds"]
+                measures["stages"][name] = {
+                    "seconds": seconds,
+                    "throughput": counts[unit] / seconds if seconds else 0.0,
+                    "unit": f"{unit}/s",
+                    "peak_rss_mib": stage_result["peak_rss"],
+                }
+            return measures
+
+    @staticmethod
+    def __get_stage_arguments(name: str, outputs: Dict[str, Any]) -> List[Any]:
+        """Get the arguments of a stage from the results of the stages before it
+
+        Args:
+            name (str): The name of the stage
+            outputs (Dict[str, Any]): The result of each stage already run
+
+        Returns:
+            List[Any]: The arguments, as main.py passes them
+        """
+        if name == "indexer":
+            return list(outputs["inverted_list"])
+        if name == "search":
+            return [outputs["indexer"], outputs["inverted_list"][1]]
+        if name == "validation":
+            return [outputs["search"], outputs["inverted_list"][1]]
+        return []
+
+    def __log_stage_output(self, workspace: str, lines: int = 20):
+        """Log the end of the output of the stages
+
+        Args:
+            workspace (str): The directory the pipeline runs in
+            lines (int): How many lines are logged. Default: 20
+        """
+        with open(
+            os.path.join(workspace, STAGE_LOG_FILE), encoding="utf-8", errors="replace"
+        ) as file:
+            output = [line.rstrip() for line in file if line.strip()]
+        for line in output[-lines:]:
+            self.logger.error(line)
+
+    def measure(self) -> Dict[str, Any]:
+        """Run the pipeline on every scale
+
+        Returns:
+            Dict[str, Any]: The environment and the measures of each scale
+        """
+        return {
+            "environment": get_environment(),
+            "scales": {str(scale): self.measure_scale(scale) for scale in self.scales},
+        }
+
+    def compare(
+        self, measures: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+    ) -> bool:
+        """Log the measures next to the baseline and find the regressions
+
+        Args:
+            measures (Dict[str, Any]): The measures of this run
+            baseline (Dict[str, Any]): The stored measures
+            tolerance (float): How much slower or larger than the baseline a
+                stage may be, as a fraction of the baseline
+
+        Returns:
+            bool: If every stage ran and none regressed
+        """
+        if baseline and baseline.get("environment") != measures["environment"]:
+            self.logger.warning(
+                f"The baseline was measured on {baseline.get('environment')}"
+            )
+
+        passed = True
+        for scale, scale_measures in measures["scales"].items():
+            baseline_stages = (
+                baseline.get("scales", {}).get(scale, {}).get("stages", {})
+                if baseline
+                else {}
+            )
+            for name, stage_measures in scale_measures["stages"].items():
+                if stage_measures.get("failed"):
+                    passed = False
+                    continue
+                message = (
+                    f"{scale}x {name}: {stage_measures['seconds']:.3f}s, "
+                    f"{stage_measures['throughput']:.1f} {stage_measures['unit']}, "
+                    f"{stage_measures['peak_rss_mib']:.1f} MiB peak RSS"
+                )
+                baseline_measures = baseline_stages.get(name)
+                if not baseline_measures or baseline_measures.get("failed"):
+                    self.logger.info(message)
+                    continue
+
+                regressions = self.__find_regressions(
+                    stage_measures, baseline_measures, tolerance
+                )
+                message += " ({})".format(
+                    ", ".join(
+                        f"{measure} {stage_measures[measure] / baseline_measures[measure] - 1:+.0%}"
+                        for measure in ("seconds", "peak_rss_mib")
+                    )
+                )
+                if regressions:
+                    passed = False
+                    self.logger.error(
+                        f"{message}: {', '.join(regressions)} above the baseline"
+                    )
+                else:
+                    self.logger.info(message)
+        return passed
+
+    @staticmethod
+    def __find_regressions(
+        stage_measures: Dict[str, Any],
+        baseline_measures: Dict[str, Any],
+        tolerance: float,
+    ) -> List[str]:
+        """Find the measures of a stage above the baseline and the tolerance
+
+        Args:
+            stage_measures (Dict[str, Any]): The measures of the stage
+            baseline_measures (Dict[str, Any]): The stored measures of the stage
+            tolerance (float): The allowed increase, as a fraction of the baseline
+
+        Returns:
+            List[str]: The names of the measures that regressed
+        """
+        return [
+            measure
+            for measure in ("seconds", "peak_rss_mib")
+            if stage_measures[measure] > baseline_measures[measure] * (1 + tolerance)
+        ]
+
+    def run(
+        self, baseline_path: str, tolerance: float, save_baseline: bool = False
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """Measure every scale and compare with the baseline
+
+        Args:
+            baseline_path (str): The json file with the stored measures
+            tolerance (float): The allowed increase, as a fraction of the baseline
+            save_baseline (bool): If the measures replace the baseline. Default: False
+
+        Returns:
+            Tuple[bool, Dict[str, Any]]: If no stage failed or regressed, and the
+                measures
+        """
+        baseline: Dict[str, Any] = {}
+        if os.path.exists(baseline_path):
+            with open(baseline_path, encoding="utf-8") as file:
+                baseline = json.load(file)
+        elif not save_baseline:
+            self.logger.warning(f"No baseline at {baseline_path}")
+
+        measures = self.measure()
+        passed = self.compare(measures, {} if save_baseline else baseline, tolerance)
+        if save_baseline:
+            os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+            with open(baseline_path, "w", encoding="utf-8") as file:
+                json.dump(measures, file, indent=2)
+                file.write("\n")
+            self.logger.info(f"Baseline saved to {baseline_path}")
+        return passed, measures
+
+
+if __name__ == "__main__":
+    run_stage(*sys.argv[1:])
@@ -0,0 +1,108 @@
+import logging
+import timeit
+from typing import Dict, List, Tuple
+from vetorial_model.search_engine.engine import SearchEngine
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+
+
+class PruningBenchmark:
+    """Initialize the PruningBenchmark
+
+    Compares the MaxScore dynamic pruning against the exhaustive evaluation
+    of the top k documents of every query.
+
+    Args:
+        search_engine (SearchEngine): The search engine with the model and the
+            queries read.
+        top_k (int): How many documents are selected for each query.
+    """
+
+    def __init__(self, search_engine: SearchEngine, top_k: int):
+        self.logger = get_logger_with_date_output("PruningBenchmark")
+        self.search_engine = search_engine
+        self.search_engine.logger.setLevel(logging.WARNING)
+        self.top_k = top_k
+        self.queries: Dict[str, List[str]] = search_engine.query_token_dictionary
+
+    def find_mismatches(self) -> List[str]:
+        """Search every query both ways
+
+        Returns:
+            List[str]: The queries with a different top k
+        """
+        exhaustive = self.search_engine.search_documents(self.top_k)
+        pruned = self.search_engine.search_documents(self.top_k, pruning=True)
+        return [query for query in self.queries if exhaustive[query] != pruned[query]]
+
+    def count_postings(self) -> Tuple[int, int]:
+        """Count the postings evaluated by each evaluation
+
+        Returns:
+            Tuple[int, int]: The postings of the exhaustive and of the pruned evaluation
+        """
+        postings = self.search_engine.postings
+        evaluator = self.search_engine.get_max_score_evaluator()
+        exhaustive = sum(
+            len(postings[token])
+            for tokens in self.queries.values()
+            for token in tokens
+            if token in postings
+        )
+        pruned = sum(
+            evaluator.evaluate(tokens, self.top_k)[1] for tokens in self.queries.values()
+        )
+        return exhaustive, pruned
+
+    def measure(self, repeat: int = 5) -> Tuple[float, float]:
+        """Measure the time to search every query each way
+
+        Args:
+            repeat (int): How many times the queries are searched. Default: 5
+
+        Returns:
+            Tuple[float, float]: The best time of the exhaustive and of the pruned evaluation
+        """
+        search_documents = self.search_engine.search_documents
+        exhaustive = min(
+            timeit.repeat(lambda: search_documents(self.top_k), number=1, repeat=repeat)
+        )
+        pruned = min(
+            timeit.repeat(
+                lambda: search_documents(self.top_k, pruning=True),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        return exhaustive, pruned
+
+    def run(self, repeat: int = 5) -> bool:
+        """Check the pruned top k and log the postings evaluated and the latency
+
+        Args:
+            repeat (int): How many times the queries are searched. Default: 5
+
+        Returns:
+            bool: If both evaluations gave the same top k for every query
+        """
+        mismatches = self.find_mismatches()
+        if mismatches:
+            self.logger.error(
+                f"{len(mismatches)} queries with a different top {self.top_k}, "
+                f"the first one is {mismatches[0]}"
+            )
+            return False
+        self.logger.info(f"Every query has the same top {self.top_k}")
+
+        exhaustive_postings, pruned_postings = self.count_postings()
+        self.logger.info(
+            f"Postings evaluated: exhaustive {exhaustive_postings}, "
+            f"pruned {pruned_postings} "
+            f"({pruned_postings / max(exhaustive_postings, 1):.1%})"
+        )
+        exhaustive, pruned = self.measure(repeat)
+        queries = max(len(self.queries), 1)
+        self.logger.info(
+            f"Latency per query: exhaustive {exhaustive / queries * 1000:.3f} ms, "
+            f"pruned {pruned / queries * 1000:.3f} ms"
+        )
+        return True
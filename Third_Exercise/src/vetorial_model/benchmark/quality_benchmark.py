@@ -0,0 +1,102 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+import pandas as pd
+from vetorial_model.processor.reader.search_result_reader import (
+    SEARCH_RESULT_COLUMNS,
+    SEARCH_RESULT_DTYPES,
+)
+from vetorial_model.search_engine.engine import SearchEngine
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+from vetorial_model.validator.metrics import (
+    calculate_ranking_metrics,
+    summarize_ranking_metrics,
+)
+
+
+class QualityBenchmark:
+    """Initialize the QualityBenchmark
+
+    Compares the ranking metrics and the search time of the full ranking with
+    the ones of the top k, exhaustive and with the MaxScore dynamic pruning,
+    so a cheaper search setting can be picked without losing quality.
+
+    Args:
+        search_engine (SearchEngine): The search engine with the model and the
+            queries read.
+        expected_results (pd.DataFrame): The NUMBER, DOCNUMBER and DOCVOTES of
+            esperados.csv
+        top_ks (List[int]): The top k settings compared with the full ranking.
+    """
+
+    def __init__(
+        self,
+        search_engine: SearchEngine,
+        expected_results: pd.DataFrame,
+        top_ks: List[int],
+    ):
+        self.logger = get_logger_with_date_output("QualityBenchmark")
+        self.search_engine = search_engine
+        self.search_engine.logger.setLevel(logging.WARNING)
+        self.expected_results = expected_results
+        self.top_ks = top_ks
+
+    def evaluate(
+        self, top_k: Optional[int] = None, pruning: bool = False
+    ) -> Tuple[pd.Series, float]:
+        """Search every query with a setting and calculate the mean metrics
+
+        Args:
+            top_k (Optional[int]): How many documents are kept for each query.
+                Default: None, which keeps every document
+            pruning (bool): If the top k is selected with the MaxScore dynamic
+                pruning. Default: False
+
+        Returns:
+            Tuple[pd.Series, float]: The mean metrics and the search time
+        """
+        start_time = time.perf_counter()
+        rankings = list(self.search_engine.iter_search_documents(top_k, pruning))
+        search_time = time.perf_counter() - start_time
+
+        results = pd.DataFrame(
+            [
+                (int(query), rank, int(document), similarity)
+                for query, ranking in rankings
+                for rank, document, similarity in ranking
+            ],
+            columns=SEARCH_RESULT_COLUMNS,
+        ).astype(SEARCH_RESULT_DTYPES)
+        metrics = calculate_ranking_metrics(results, self.expected_results)
+        return summarize_ranking_metrics(metrics), search_time
+
+    def run(self) -> bool:
+        """Log the mean metrics and the search time of every setting
+
+        Returns:
+            bool: If the pruned top k had the same metrics as the exhaustive one
+        """
+        settings = [("full ranking", None, False)]
+        for top_k in self.top_ks:
+            settings.append((f"top {top_k}", top_k, False))
+            settings.append((f"top {top_k} pruned", top_k, True))
+
+        summaries = {}
+        times = {}
+        for name, top_k, pruning in settings:
+            summaries[name], times[name] = self.evaluate(top_k, pruning)
+            self.logger.info(
+                "%s: %.3fs, %s",
+                name,
+                times[name],
+                ", ".join(
+                    f"{metric} {value:.4f}" for metric, value in summaries[name].items()
+                ),
+            )
+
+        passed = True
+        for top_k in self.top_ks:
+            if not summaries[f"top {top_k}"].equals(summaries[f"top {top_k} pruned"]):
+                self.logger.error(f"The pruned top {top_k} has different metrics")
+                passed = False
+        return passed
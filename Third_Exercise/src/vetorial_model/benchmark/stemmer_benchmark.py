@@ -0,0 +1,98 @@
+import timeit
+from typing import List, Tuple
+from vetorial_model.stemmer.fast_porter import stem_word
+from vetorial_model.stemmer.porter import PorterStemmer
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+
+
+class StemmerBenchmark:
+    """Initialize the StemmerBenchmark
+
+    Compares the fast Porter stemmer against the original PorterStemmer class
+    on the vocabulary of an inverted list.
+
+    Args:
+        file_path (str): The path of the csv inverted list with the vocabulary.
+    """
+
+    def __init__(self, file_path: str):
+        self.logger = get_logger_with_date_output("StemmerBenchmark")
+        self.file_path = file_path
+        self.words = self.__read_vocabulary()
+
+    def __read_vocabulary(self) -> List[str]:
+        """Read the words of the inverted list
+
+        Returns:
+            List[str]: The words
+        """
+        self.logger.info(f"Reading vocabulary from {self.file_path}")
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            next(file)
+            words = [line.split(";", 1)[0] for line in file]
+        self.logger.info(f"Found {len(words)} words")
+        return words
+
+    def find_mismatches(self) -> List[Tuple[str, str, str]]:
+        """Stem every word with both stemmers
+
+        Returns:
+            List[Tuple[str, str, str]]: The word, the original stem and the fast
+                stem of every word stemmed differently
+        """
+        stemmer = PorterStemmer()
+        mismatches = []
+        for word in self.words:
+            expected = stemmer.stem(word, 0, len(word) - 1)
+            stemmed = stem_word(word)
+            if expected != stemmed:
+                mismatches.append((word, expected, stemmed))
+        return mismatches
+
+    def measure(self, repeat: int = 5) -> Tuple[float, float]:
+        """Measure the time to stem the whole vocabulary with each stemmer
+
+        Args:
+            repeat (int): How many times the vocabulary is stemmed. Default: 5
+
+        Returns:
+            Tuple[float, float]: The best time of the original and of the fast stemmer
+        """
+        stemmer = PorterStemmer()
+        words = self.words
+
+        def run_original():
+            for word in words:
+                stemmer.stem(word, 0, len(word) - 1)
+
+        def run_fast():
+            for word in words:
+                stem_word(word)
+
+        original = min(timeit.repeat(run_original, number=1, repeat=repeat))
+        fast = min(timeit.repeat(run_fast, number=1, repeat=repeat))
+        return original, fast
+
+    def run(self, repeat: int = 5) -> bool:
+        """Check the fast stemmer output and log the speedup
+
+        Args:
+            repeat (int): How many times the vocabulary is stemmed. Default: 5
+
+        Returns:
+            bool: If both stemmers gave the same stem for every word
+        """
+        mismatches = self.find_mismatches()
+        for word, expected, stemmed in mismatches[:20]:
+            self.logger.error(f"{word}: expected {expected}, got {stemmed}")
+        if mismatches:
+            self.logger.error(f"{len(mismatches)} words stemmed differently")
+            return False
+        self.logger.info("Every word stemmed like the original stemmer")
+
+        original, fast = self.measure(repeat)
+        self.logger.info(
+            f"Original: {original:.3f}s, fast: {fast:.3f}s, "
+            f"speedup {original / fast:.2f}x"
+        )
+        return True
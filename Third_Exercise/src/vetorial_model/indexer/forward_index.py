@@ -0,0 +1,57 @@
+from collections import Counter
+from typing import Dict, List
+
+
+class ForwardIndexBuilder:
+    """Initialize the ForwardIndexBuilder
+
+    Turns the postings of an inverted list (term -> documents) into a forward
+    index (document -> term frequencies) in a single pass.
+    """
+
+    def __init__(self):
+        self.forward_index: Dict[str, Counter] = {}
+
+    def add_postings(self, term: str, documents: Dict[str, int]):
+        """Add the postings of a term to the forward index
+
+        Args:
+            term (str): The term
+            documents (Dict[str, int]): The frequency of the term on each document
+        """
+        for document, frequency in documents.items():
+            if document not in self.forward_index:
+                self.forward_index[document] = Counter()
+            self.forward_index[document][term] += frequency
+
+    @property
+    def documents(self) -> List[str]:
+        """Get the documents, in the order they were first seen
+
+        Returns:
+            List[str]: The documents
+        """
+        return list(self.forward_index)
+
+    @property
+    def number_of_terms(self) -> Dict[str, int]:
+        """Get the number of distinct terms of every document
+
+        Returns:
+            Dict[str, int]: The number of distinct terms of each document
+        """
+        return {
+            document: len(terms) for document, terms in self.forward_index.items()
+        }
+
+    @property
+    def document_lengths(self) -> Dict[str, int]:
+        """Get the number of term occurrences of every document
+
+        Returns:
+            Dict[str, int]: The length of each document
+        """
+        return {
+            document: sum(terms.values())
+            for document, terms in self.forward_index.items()
+        }
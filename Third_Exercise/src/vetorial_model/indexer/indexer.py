@@ -1,9 +1,18 @@
 import ast
 from collections import Counter
-from typing import Dict
+from typing import Dict, List, Tuple
+import numpy as np
 import pandas as pd
+from scipy.sparse import csr_matrix
+from vetorial_model.indexer.forward_index import ForwardIndexBuilder
+from vetorial_model.processor.reader.binary_index_reader import BinaryIndexReader
+from vetorial_model.utils.id_table import IdTable
 from vetorial_model.utils.logger_utils import get_logger_with_date_output
-from vetorial_model.utils.shared import calculate_tf_idf
+from vetorial_model.utils.shared import (
+    calculate_tf_idf_array,
+    get_document_norms_path,
+    get_stemmer_file_path,
+)
 
 
 class Indexer:
@@ -14,30 +23,28 @@ class Indexer:
         last_document: str,
         save_path: str,
     ):
-        if (
-            stemmer
-            and inverted_list_file_path.endswith(".csv")
-            and save_path.endswith(".csv")
-        ):
-            inverted_list_file_path = inverted_list_file_path.replace(
-                ".csv", "_stemmer.csv"
-            )
-            save_path = save_path.replace(".csv", "_stemmer.csv")
-        else:
-            inverted_list_file_path = inverted_list_file_path.replace(
-                ".csv", "_nostemmer.csv"
-            )
-            save_path = save_path.replace(".csv", "_nostemmer.csv")
+        inverted_list_file_path = get_stemmer_file_path(
+            inverted_list_file_path, stemmer
+        )
+        save_path = get_stemmer_file_path(save_path, stemmer)
 
         self.inverted_list_file_path = inverted_list_file_path
         self.save_path = save_path
         self.last_document = int(last_document.strip())
         self.logger = get_logger_with_date_output("Indexer")
-        self.words_table = self.__read_words_table(inverted_list_file_path)
-        self.list_of_documents = self.__get_list_of_documents()
+        if inverted_list_file_path.endswith(".bin"):
+            self.words_table, self.postings = self.__read_binary_index(
+                inverted_list_file_path
+            )
+        else:
+            self.words_table = self.__read_words_table(inverted_list_file_path)
+            self.postings = self.__parse_postings()
+        self.forward_index = self.__build_forward_index()
+        self.list_of_documents = self.forward_index.documents
         self.total_of_terms_on_documents = (
             self.__calculate_total_of_terms_on_documents()
         )
+        self.document_lengths = self.forward_index.document_lengths
 
     def __read_words_table(self, file_path: str) -> pd.DataFrame:
         """Read the words table from the file path
@@ -54,22 +61,52 @@ class Indexer:
         self.logger.info("Words table read")
         return words_table
 
-    def __get_list_of_documents(self) -> list:
-        """Get the list of documents
+    def __read_binary_index(
+        self, file_path: str
+    ) -> Tuple[pd.DataFrame, List[Dict[str, int]]]:
+        """Read the words table and its postings from a binary inverted index
+
+        Args:
+            file_path (str): The file path
 
         Returns:
-            list: The list of documents
+            Tuple[pd.DataFrame, List[Dict[str, int]]]: The words table and the
+                frequency of each word on each document
         """
-        self.logger.info("Getting list of documents")
-        list_of_documents = []
-        for _, row in self.words_table.iterrows():
-            documents = ast.literal_eval(row["DOCUMENTS_LIST"])
-            list_of_documents.extend(documents)
+        self.logger.info("Reading binary index")
+        reader = BinaryIndexReader(file_path)
+        words = [word for word in reader.terms if len(word) > 2]
+        words_table = pd.DataFrame({"WORD": words})
+        postings = [reader.read_postings(word) for word in words]
+        self.logger.info("Binary index read")
+        return words_table, postings
+
+    def __parse_postings(self) -> List[Dict[str, int]]:
+        """Parse the documents list of every word of the words table
 
-        list_of_documents = list(set(list_of_documents))
+        Returns:
+            List[Dict[str, int]]: The frequency of each word on each document
+        """
+        self.logger.info("Parsing postings")
+        postings = [
+            Counter(ast.literal_eval(documents))
+            for documents in self.words_table["DOCUMENTS_LIST"]
+        ]
+        self.logger.info("Postings parsed")
+        return postings
 
-        self.logger.info("List of documents retrieved")
-        return list_of_documents
+    def __build_forward_index(self) -> ForwardIndexBuilder:
+        """Build the forward index from the parsed postings
+
+        Returns:
+            ForwardIndexBuilder: The forward index
+        """
+        self.logger.info("Building forward index")
+        forward_index = ForwardIndexBuilder()
+        for word, documents in zip(self.words_table["WORD"], self.postings):
+            forward_index.add_postings(word, documents)
+        self.logger.info("Forward index built")
+        return forward_index
 
     def __filter_dataframe(self, dataframe: pd.DataFrame, size: int) -> pd.DataFrame:
         """Given a size, drop every line that the word size is lower or equal than this value.
@@ -95,47 +132,77 @@ class Indexer:
             Dict[str, int]: The total of terms on documents
         """
         self.logger.info("Calculating total of terms on documents")
-        total_of_terms_on_documents = {}
-        for document in self.list_of_documents:
-            total_of_terms_on_documents[document] = len(
-                self.words_table[
-                    self.words_table["DOCUMENTS_LIST"].str.contains(document)
-                ]
-            )
-
+        total_of_terms_on_documents = self.forward_index.number_of_terms
         self.logger.info("Total of terms on documents calculated")
         return total_of_terms_on_documents
 
-    def calculate_dataframe_tfidf(self) -> pd.DataFrame:
-        """Calculate the tfidf of the dataframe
+    def calculate_sparse_tfidf(self) -> csr_matrix:
+        """Calculate the tfidf as a sparse terms x documents matrix
 
         Returns:
-            pandas.DataFrame: The dataframe with the tfidf
+            csr_matrix: The tfidf, with the rows of the words table and the
+                columns of the list of documents
         """
+        self.logger.info("Calculating sparse tfidf")
+        document_table = IdTable(self.list_of_documents)
+        columns = np.concatenate(
+            [np.zeros(0, dtype=np.int32)]
+            + [
+                np.frombuffer(document_table.to_ids(documents), dtype=np.intc)
+                for documents in self.postings
+            ]
+        )
+        frequencies = np.fromiter(
+            (
+                frequency
+                for documents in self.postings
+                for frequency in documents.values()
+            ),
+            dtype=np.int32,
+            count=len(columns),
+        )
 
-        dataframe = self.words_table.join(
-            pd.DataFrame(
-                0.0,
-                index=self.words_table.index,
-                columns=self.list_of_documents,
-            )
+        number_of_rows = len(self.words_table)
+        number_of_columns = len(self.list_of_documents)
+        number_of_terms = np.array(
+            [len(documents) for documents in self.postings], dtype=np.int32
+        )
+        rows = np.repeat(np.arange(number_of_rows, dtype=np.int32), number_of_terms)
+
+        values = calculate_tf_idf_array(
+            self.last_document,
+            number_of_terms[rows],
+            frequencies,
         )
+        matrix = csr_matrix(
+            (values, (rows, columns)), shape=(number_of_rows, number_of_columns)
+        )
+        self.logger.info("Sparse tfidf calculated")
+        return matrix
+
+    def convert_sparse_tfidf_to_dataframe(self, matrix: csr_matrix) -> pd.DataFrame:
+        """Convert the sparse tfidf to the dense model dataframe
+
+        Args:
+            matrix (csr_matrix): The sparse tfidf
 
-        self.logger.info("Calculating tfidf")
-        for index, row in dataframe.iterrows():
-            documents = ast.literal_eval(row["DOCUMENTS_LIST"])
-            word_frequence_on_document = Counter(documents)
-            for document in documents:
-                dataframe.at[index, document] = calculate_tf_idf(
-                    self.last_document,
-                    len(set(documents)),
-                    word_frequence_on_document[document],
-                )
-
-        self.logger.info("Tfidf calculated")
-        dataframe = dataframe.drop(["DOCUMENTS_LIST"], axis=1)
+        Returns:
+            pandas.DataFrame: The dataframe with the tfidf
+        """
+        self.logger.info("Converting sparse tfidf to dataframe")
+        dataframe = pd.DataFrame(matrix.toarray(), columns=self.list_of_documents)
+        dataframe.insert(0, "WORD", self.words_table["WORD"])
+        self.logger.info("Sparse tfidf converted")
         return dataframe
 
+    def calculate_dataframe_tfidf(self) -> pd.DataFrame:
+        """Calculate the tfidf of the dataframe
+
+        Returns:
+            pandas.DataFrame: The dataframe with the tfidf
+        """
+        return self.convert_sparse_tfidf_to_dataframe(self.calculate_sparse_tfidf())
+
     def write_dataframe_to_file_path(self, dataframe: pd.DataFrame):
         """Write the dataframe to the file path
 
@@ -146,3 +213,37 @@ class Indexer:
         dataframe.to_csv(self.save_path, index=False, sep=";", encoding="utf_8")
         self.list_of_documents = dataframe.columns.tolist()[1:]
         self.logger.info("Model written to file path")
+
+    def calculate_document_norms(self, matrix: csr_matrix) -> Dict[str, float]:
+        """Calculate the sum of the squared tfidf values of every document column
+
+        Args:
+            matrix (csr_matrix): The sparse tfidf
+
+        Returns:
+            Dict[str, float]: The norm of each document
+        """
+        self.logger.info("Calculating document norms")
+        matrix = matrix.tocsc()
+        matrix.sort_indices()
+        document_norms = {}
+        for index, document in enumerate(self.list_of_documents):
+            values = matrix.data[matrix.indptr[index] : matrix.indptr[index + 1]]
+            document_norms[document] = sum(value**2 for value in values.tolist())
+
+        self.logger.info("Document norms calculated")
+        return document_norms
+
+    def write_document_norms_to_file_path(self, document_norms: Dict[str, float]):
+        """Write the document norms alongside the model
+
+        Args:
+            document_norms (Dict[str, float]): The norm of each document
+        """
+        norms_path = get_document_norms_path(self.save_path)
+        self.logger.info(f"Writing document norms to file {norms_path}")
+        with open(norms_path, "w", encoding="utf_8") as file:
+            file.write("DOCUMENT;NORM\n")
+            for document, norm in document_norms.items():
+                file.write(f"{document};{norm!r}\n")
+        self.logger.info("Document norms written")
@@ -0,0 +1,492 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from vetorial_model.processor.generator.inverted_list_generator import (
+    InvertedListGenerator,
+)
+from vetorial_model.processor.reader.binary_index_reader import BinaryIndexReader
+from vetorial_model.search_engine.term_postings import TermPostings
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+from vetorial_model.utils.shared import calculate_tf_idf
+
+try:
+    import fcntl
+except ImportError:  # There are no advisory locks on Windows, one writer is assumed
+    fcntl = None
+
+MANIFEST_FILE = "segments.json"
+LOCK_FILE = "segments.lock"
+
+
+class Segment:
+    """Initialize the Segment
+
+    A binary inverted index of the records added at once, and the records of
+    it deleted since then.
+
+    Args:
+        file_path (str): The path of the binary inverted index.
+        deleted (Optional[Iterable[int]]): The deleted document ids. Default: None
+    """
+
+    def __init__(self, file_path: str, deleted: Optional[Iterable[int]] = None):
+        self.file_path = file_path
+        self.reader = BinaryIndexReader(file_path, memory_map=True)
+        self.document_ids = set(self.reader.document_ids)
+        self.deleted: Set[int] = set(deleted or ())
+
+    @property
+    def live_documents(self) -> Set[int]:
+        """Get the documents of the segment that were not deleted
+
+        Returns:
+            Set[int]: The document ids
+        """
+        return self.document_ids - self.deleted
+
+    @property
+    def last_document(self) -> int:
+        """Get the highest document id of the segment that was not deleted
+
+        Returns:
+            int: The document id, 0 when every document was deleted
+        """
+        return max(self.live_documents, default=0)
+
+    def read_live_postings(self, term: str) -> Tuple[List[int], List[int]]:
+        """Read the postings of a term without the deleted documents
+
+        Args:
+            term (str): The term
+
+        Returns:
+            Tuple[List[int], List[int]]: The document ids and the frequencies
+        """
+        documents, frequencies = self.reader.read_postings_ids(term)
+        if not self.deleted:
+            return documents, frequencies
+        live_postings = [
+            (document, frequency)
+            for document, frequency in zip(documents, frequencies)
+            if document not in self.deleted
+        ]
+        return (
+            [document for document, _ in live_postings],
+            [frequency for _, frequency in live_postings],
+        )
+
+    def close(self):
+        """Unmap the binary index of the segment"""
+        self.reader.close()
+
+
+class SegmentedIndex:
+    """Initialize the SegmentedIndex
+
+    An inverted index that grows without being rebuilt. Every collection file
+    added becomes a new segment, a binary inverted index of its records only,
+    and deleting a record only tombstones it on the segment that holds it. A
+    record added again replaces the previous one. The segments and their
+    tombstones are listed on the segments.json manifest of the directory.
+
+    The segments keep the raw term frequencies only. The document frequency
+    of each term and the number of documents, the highest live RECORDNUM as
+    in the full rebuild, are taken over the live documents of every segment
+    when the postings are read, so the tfidf weights and the document norms
+    are the ones a full rebuild of the same records would give.
+
+    The merge compacts the segments into one, dropping the deleted documents.
+    It can run on a background thread while records are added and deleted,
+    by this or by other processes. Every change takes the segments.lock file
+    and reads the manifest again first, so the processes see the changes of
+    each other, and refresh lets a reader pick them up.
+
+    Args:
+        directory (str): The directory of the segments.
+        stemmer (bool): If the stemmer is used.
+    """
+
+    def __init__(self, directory: str, stemmer: bool):
+        self.logger = get_logger_with_date_output("SegmentedIndex")
+        self.directory = directory
+        self.stemmer = stemmer
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self.lock_path = os.path.join(directory, LOCK_FILE)
+        self.lock = threading.RLock()
+        self.merge_lock = threading.Lock()
+        self.merge_thread: Optional[threading.Thread] = None
+        self.stop_merge = threading.Event()
+        self.manifest_version: Optional[Tuple[int, int, int]] = None
+        self.next_segment = 1
+        self.segments: List[Segment] = []
+        os.makedirs(directory, exist_ok=True)
+        self.refresh()
+
+    @contextmanager
+    def __locked(self) -> Iterator[None]:
+        """Lock the segments against the other threads and processes, with the
+        manifest read again
+
+        Yields:
+            None: While the segments are locked
+        """
+        with self.lock, open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self.__read_manifest()
+            yield
+
+    def __get_manifest_version(self) -> Optional[Tuple[int, int, int]]:
+        """Get the inode, the modification time and the size of the manifest
+
+        The manifest is replaced on every write, so its inode changes even when
+        two writes fall on the same modification time.
+
+        Returns:
+            Optional[Tuple[int, int, int]]: The version, None when there is no manifest
+        """
+        try:
+            status = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return status.st_ino, status.st_mtime_ns, status.st_size
+
+    def refresh(self) -> bool:
+        """Read the manifest again when another process changed it
+
+        Returns:
+            bool: If the segments changed
+        """
+        if self.__get_manifest_version() == self.manifest_version:
+            return False
+        with self.__locked():
+            return True
+
+    def __read_manifest(self):
+        """Read the segments and their tombstones from the manifest, when it changed
+
+        The segments already open are kept, and the ones no longer listed are closed.
+        """
+        version = self.__get_manifest_version()
+        if version is None or version == self.manifest_version:
+            return
+        self.logger.info(f"Reading manifest {self.manifest_path}")
+        with open(self.manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest["stemmer"] != self.stemmer:
+            raise ValueError(
+                f"{self.directory} was indexed with stemmer={manifest['stemmer']}"
+            )
+        open_segments = {segment.file_path: segment for segment in self.segments}
+        segments = []
+        for listed_segment in manifest["segments"]:
+            file_path = os.path.join(self.directory, listed_segment["file"])
+            segment = open_segments.pop(file_path, None) or Segment(file_path)
+            segment.deleted = set(listed_segment["deleted"])
+            segments.append(segment)
+        for segment in open_segments.values():
+            segment.close()
+        self.next_segment = manifest["next_segment"]
+        self.segments = segments
+        self.manifest_version = version
+        self.logger.info(f"Found {len(self.segments)} segments")
+
+    def __write_manifest(self):
+        """Write the manifest, replacing the previous one at once"""
+        manifest = {
+            "stemmer": self.stemmer,
+            "next_segment": self.next_segment,
+            "segments": [
+                {
+                    "file": os.path.basename(segment.file_path),
+                    "deleted": sorted(segment.deleted),
+                }
+                for segment in self.segments
+            ],
+        }
+        temporary_path = f"{self.manifest_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(temporary_path, self.manifest_path)
+        self.manifest_version = self.__get_manifest_version()
+
+    def __create_generator(self) -> InvertedListGenerator:
+        """Create the generator of the next segment, reserving its file on the manifest
+
+        Returns:
+            InvertedListGenerator: The generator
+        """
+        with self.__locked():
+            segment_path = os.path.join(
+                self.directory, f"segment_{self.next_segment:06d}.bin"
+            )
+            self.next_segment += 1
+            self.__write_manifest()
+        return InvertedListGenerator(segment_path, self.stemmer)
+
+    @property
+    def document_id_width(self) -> int:
+        """Get the width of the zero padded document ids
+
+        Returns:
+            int: The width
+        """
+        return max(
+            (segment.reader.document_id_width for segment in self.segments), default=0
+        )
+
+    @property
+    def last_document(self) -> int:
+        """Get the highest document id that was not deleted, the number of
+        documents of the tfidf
+
+        Returns:
+            int: The document id, 0 when there is no live document
+        """
+        return max((segment.last_document for segment in self.segments), default=0)
+
+    def add_file(self, file_path: str) -> Optional[Segment]:
+        """Add the records of a collection file as a new segment
+
+        Args:
+            file_path (str): The path of the collection file
+
+        Returns:
+            Optional[Segment]: The new segment, None when no record has an abstract
+        """
+        self.logger.info(f"Adding {file_path}")
+        generator = self.__create_generator()
+        grouped_rows, _ = generator.build_file_inverted_list(file_path)
+        if not grouped_rows:
+            return None
+        generator.write_binary_index_to_file_path(grouped_rows)
+        segment = Segment(generator.file_path)
+
+        with self.__locked():
+            for previous_segment in self.segments:
+                previous_segment.deleted |= (
+                    previous_segment.document_ids & segment.document_ids
+                )
+            self.segments.append(segment)
+            self.__write_manifest()
+        return segment
+
+    def delete_documents(self, record_numbers: Iterable[str]) -> int:
+        """Tombstone records on the segments that hold them
+
+        Args:
+            record_numbers (Iterable[str]): The RECORDNUM of the records
+
+        Returns:
+            int: The number of records deleted
+        """
+        documents = {int(record_number) for record_number in record_numbers}
+        deleted = 0
+        with self.__locked():
+            for segment in self.segments:
+                found = segment.live_documents & documents
+                segment.deleted |= found
+                deleted += len(found)
+            self.__write_manifest()
+        self.logger.info(f"Deleted {deleted} documents")
+        return deleted
+
+    def read_postings(
+        self,
+    ) -> Tuple[List[str], Dict[str, TermPostings], List[float]]:
+        """Read the tfidf postings of the live documents of every segment
+
+        Returns:
+            Tuple[List[str], Dict[str, TermPostings], List[float]]: The
+                documents list, the (document index, tfidf) pairs of each term and
+                the norm of each document
+        """
+        with self.lock:
+            return self.__read_postings()
+
+    def __read_postings(
+        self,
+    ) -> Tuple[List[str], Dict[str, TermPostings], List[float]]:
+        """Read the tfidf postings, with the segments locked
+
+        Returns:
+            Tuple[List[str], Dict[str, TermPostings], List[float]]: The
+                documents list, the (document index, tfidf) pairs of each term and
+                the norm of each document
+        """
+        segments = self.segments
+        document_id_width = self.document_id_width
+        document_ids = sorted(set().union(*(s.live_documents for s in segments)))
+        # Deleting the highest RECORDNUM lowers the number of documents, as a
+        # rebuild without it would
+        number_of_documents = document_ids[-1] if document_ids else 0
+        document_indexes = {document: index for index, document in enumerate(document_ids)}
+
+        # The terms keep the order of their first live occurrence, as in a
+        # rebuild of the live records
+        term_frequencies: Dict[str, List[Tuple[int, int]]] = {}
+        for segment in segments:
+            for term in segment.reader.terms:
+                documents, frequencies = segment.read_live_postings(term)
+                if documents:
+                    term_frequencies.setdefault(term, []).extend(
+                        (document_indexes[document], frequency)
+                        for document, frequency in zip(documents, frequencies)
+                    )
+
+        document_norms = [0.0] * len(document_ids)
+        postings: Dict[str, TermPostings] = {}
+        for term, frequencies in term_frequencies.items():
+            frequencies.sort()
+            term_postings = TermPostings()
+            for index, frequency in frequencies:
+                tf_idf = calculate_tf_idf(number_of_documents, len(frequencies), frequency)
+                document_norms[index] += tf_idf**2
+                term_postings.documents.append(index)
+                term_postings.values.append(tf_idf)
+            postings[term] = term_postings
+
+        documents_list = [f"{document:0{document_id_width}d}" for document in document_ids]
+        self.logger.info(
+            f"Read {len(postings)} terms of {len(documents_list)} documents "
+            f"from {len(segments)} segments"
+        )
+        return documents_list, postings, document_norms
+
+    def needs_merge(self, max_segments: int) -> bool:
+        """Check if the segments should be compacted
+
+        Args:
+            max_segments (int): The number of segments kept without a merge
+
+        Returns:
+            bool: If there are more segments than the maximum, or a segment
+                with half of its documents deleted
+        """
+        with self.lock:
+            return len(self.segments) > max_segments or any(
+                2 * len(segment.deleted) >= len(segment.document_ids)
+                for segment in self.segments
+            )
+
+    def merge_segments(self) -> bool:
+        """Compact the segments into one, without the deleted documents
+
+        The segments are read on their own memory maps while records are still
+        added and deleted. The documents deleted from them meanwhile are
+        tombstoned on the merged one, and the merge is dropped when another
+        process merged the same segments first.
+
+        Returns:
+            bool: If the segments were merged
+        """
+        with self.merge_lock:
+            with self.__locked():
+                segments = [
+                    Segment(segment.file_path, segment.deleted)
+                    for segment in self.segments
+                ]
+                document_id_width = self.document_id_width
+            if len(segments) < 2 and not any(segment.deleted for segment in segments):
+                for segment in segments:
+                    segment.close()
+                return False
+
+            self.logger.info(f"Merging {len(segments)} segments")
+            merged_segment = self.__write_merged_segment(segments, document_id_width)
+            merged = self.__replace_merged_segments(segments, merged_segment)
+            self.logger.info("Segments merged" if merged else "Segments already merged")
+            return merged
+
+    def __write_merged_segment(
+        self, segments: List[Segment], document_id_width: int
+    ) -> Optional[Segment]:
+        """Write the live postings of the segments as a new segment
+
+        Args:
+            segments (List[Segment]): The segments merged
+            document_id_width (int): The width of the zero padded document ids
+
+        Returns:
+            Optional[Segment]: The merged segment, None when every document was deleted
+        """
+        postings: Dict[str, Dict[str, int]] = {}
+        for segment in segments:
+            for term in segment.reader.terms:
+                documents, frequencies = segment.read_live_postings(term)
+                if not documents:
+                    continue
+                term_postings = postings.setdefault(term, {})
+                for document, frequency in zip(documents, frequencies):
+                    term_postings[f"{document:0{document_id_width}d}"] = frequency
+        if not postings:
+            return None
+
+        generator = self.__create_generator()
+        last_document = max(segment.last_document for segment in segments)
+        generator.last_document = f"{last_document:0{document_id_width}d}"
+        generator.write_binary_postings_to_file_path(postings)
+        return Segment(generator.file_path)
+
+    def __replace_merged_segments(
+        self, segments: List[Segment], merged_segment: Optional[Segment]
+    ) -> bool:
+        """Replace the segments merged by the merged one on the manifest, closing
+        and removing them
+
+        Args:
+            segments (List[Segment]): The segments merged, as they were read
+            merged_segment (Optional[Segment]): The merged segment
+
+        Returns:
+            bool: If the segments were replaced, False when they are gone
+        """
+        with self.__locked():
+            current_segments = {segment.file_path: segment for segment in self.segments}
+            for segment in segments:
+                segment.close()
+            if any(segment.file_path not in current_segments for segment in segments):
+                if merged_segment is not None:
+                    merged_segment.close()
+                    os.remove(merged_segment.file_path)
+                return False
+
+            merged_segments = [] if merged_segment is None else [merged_segment]
+            for segment in segments:
+                current_segment = current_segments.pop(segment.file_path)
+                for merged in merged_segments:
+                    merged.deleted |= current_segment.deleted - segment.deleted
+                current_segment.close()
+                os.remove(current_segment.file_path)
+            self.segments = merged_segments + list(current_segments.values())
+            self.__write_manifest()
+            return True
+
+    def start_background_merge(self, max_segments: int = 4, interval: float = 1.0):
+        """Merge the segments on a background thread whenever they need it
+
+        Args:
+            max_segments (int): The number of segments kept without a merge. Default: 4
+            interval (float): The seconds between the checks. Default: 1.0
+        """
+
+        def merge_when_needed():
+            while not self.stop_merge.wait(interval):
+                self.refresh()
+                if self.needs_merge(max_segments):
+                    self.merge_segments()
+
+        self.stop_merge.clear()
+        self.merge_thread = threading.Thread(
+            target=merge_when_needed, name="SegmentMerge", daemon=True
+        )
+        self.merge_thread.start()
+
+    def stop_background_merge(self):
+        """Stop the background merge, waiting for a running merge to finish"""
+        self.stop_merge.set()
+        if self.merge_thread is not None:
+            self.merge_thread.join()
+            self.merge_thread = None
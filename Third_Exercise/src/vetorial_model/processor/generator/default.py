@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Any, Dict, Iterable, List, Tuple
 
 from vetorial_model.utils.logger_utils import get_logger_with_date_output
 
@@ -10,14 +10,22 @@ class DefaultGenerator:
         file_path (str): The path of the csv file.
         columns (List[str]): The columns of the csv file.
         separator (str): The separator of the csv file. Default: ";"
+        write_header (bool): If the csv header should be written. Default: True
     """
 
-    def __init__(self, file_path: str, columns: List[str], separator: str = ";"):
+    def __init__(
+        self,
+        file_path: str,
+        columns: List[str],
+        separator: str = ";",
+        write_header: bool = True,
+    ):
         self.setup_generator_logger("DefaultGenerator")
         self.separator = separator
         self.file_path = file_path
         self.columns = separator.join(columns)
-        self.__write_csv_header_to_file_path()
+        if write_header:
+            self.__write_csv_header_to_file_path()
 
     def __write_csv_header_to_file_path(self):
         """Write the csv header to the file path"""
@@ -50,6 +58,22 @@ class DefaultGenerator:
                 )
             )
 
+    def write_rows_to_file_path(self, csv_rows: Iterable[Tuple[str, Any]]):
+        """Write the csv rows one at a time to the file path, as write_dictionary_to_file_path
+
+        Args:
+            csv_rows (Iterable[Tuple[str, Any]]): The key and the value of each csv row.
+        """
+        self.logger.info(f"Writing csv rows to file {self.file_path}")
+        rows_count = 0
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            for key, value in csv_rows:
+                if rows_count:
+                    file.write("\n")
+                file.write(f"{key}{self.separator}{value}")
+                rows_count += 1
+        self.logger.info(f"Wrote {rows_count} csv rows to file {self.file_path}")
+
     def setup_generator_logger(self, class_name: str):
         """Setup the logger for the class
 
@@ -1,27 +1,60 @@
-from typing import Any, Dict, List
+import heapq
+import itertools
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from collections import Counter
+from functools import lru_cache, partial
+from operator import itemgetter
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Tuple,
+)
 from xml.dom.minidom import Document
+from vetorial_model.utils.binary_index_utils import (
+    BINARY_INDEX_HEADER,
+    BINARY_INDEX_MAGIC,
+    BINARY_INDEX_VERSION,
+    UPPER_BOUND,
+    encode_postings,
+    encode_varint,
+)
+from vetorial_model.utils.id_table import IdTable
 from vetorial_model.utils.normalizer_utils import Normalize
+from vetorial_model.utils.shared import calculate_tf_idf, get_stemmer_file_path
 from vetorial_model.processor.reader.data_reader import DataReader
 from vetorial_model.processor.generator.default import DefaultGenerator
-from vetorial_model.stemmer.porter import PorterStemmer
+from vetorial_model.stemmer.stemmer_service import get_stemmer_service
+
+# The most sorted runs merged at once, so the merge never opens more files
+MAX_MERGED_RUNS = 64
+# The document ids and the frequencies are spooled as unsigned 32 bit integers
+SPOOL_TYPECODE = "I"
 
 
 class InvertedListGenerator(DefaultGenerator):
     """Initialize the InvertedListGenerator
 
     Args:
-        file_path (str): The path of the file.
+        file_path (str): The path of the file. A ".bin" path writes the binary index.
         separator (str): The separator of the csv file. Default: ";"
     """
 
     __COLUMNS = ["WORD", "DOCUMENTS_LIST"]
 
     def __init__(self, file_path: str, stemmer: bool, separator: str = ";"):
-        if stemmer and file_path.endswith(".csv"):
-            file_path = file_path.replace(".csv", "_stemmer.csv")
-        else:
-            file_path = file_path.replace(".csv", "_nostemmer.csv")
-        super().__init__(file_path, self.__COLUMNS, separator)
+        file_path = get_stemmer_file_path(file_path, stemmer)
+        self.binary = file_path.endswith(".bin")
+        super().__init__(file_path, self.__COLUMNS, separator, not self.binary)
         super().setup_generator_logger("InvertedListGenerator")
         self.last_document = ""
         self.stemmer = stemmer
@@ -52,9 +85,8 @@ class InvertedListGenerator(DefaultGenerator):
         abstract = reader.get_tag_element_value(abstracts[-1])
         abstract_words = Normalize(abstract).tokenized_text
         if self.stemmer:
-            abstract_words = [
-                PorterStemmer().stem(word, 0, len(word) - 1) for word in abstract_words
-            ]
+            stemmer_service = get_stemmer_service()
+            abstract_words = [stemmer_service.stem(word) for word in abstract_words]
 
         abstract_words = [word for word in abstract_words if len(word) > 2]
         for text in abstract_words:
@@ -84,3 +116,459 @@ class InvertedListGenerator(DefaultGenerator):
             grouped_rows[word].append(splitted_row[1])
 
         return grouped_rows
+
+    def build_file_inverted_list(self, file_path: str) -> Tuple[Dict[str, List[str]], str]:
+        """Build the partial inverted list of a single collection file
+
+        It only reads the generator configuration, so it can run on a worker process.
+
+        Args:
+            file_path (str): The path of the collection file
+
+        Returns:
+            Tuple[Dict[str, List[str]], str]: The grouped rows and the last document of the file
+        """
+        reader = DataReader(file_path)
+        rows: List[str] = []
+        for record in reader.iter_tag_elements("RECORD"):
+            rows += self.build_csv_row(reader, record)
+
+        if self.stemmer:
+            get_stemmer_service().report()
+        return self.group_by_word(rows), self.last_document
+
+    def merge_grouped_rows(
+        self, partial_inverted_lists: Iterable[Tuple[Dict[str, List[str]], str]]
+    ) -> Dict[str, List[str]]:
+        """Merge the partial inverted lists of the collection files, in order
+
+        Args:
+            partial_inverted_lists (Iterable[Tuple[Dict[str, List[str]], str]]):
+                The grouped rows and the last document of each file
+
+        Returns:
+            Dict[str, List[str]]: The grouped rows of the whole collection
+        """
+        grouped_rows: Dict[str, List[str]] = {}
+        for partial_grouped_rows, last_document in partial_inverted_lists:
+            self.last_document = max(self.last_document, last_document)
+            for word, documents in partial_grouped_rows.items():
+                if word not in grouped_rows:
+                    grouped_rows[word] = []
+                grouped_rows[word].extend(documents)
+
+        return grouped_rows
+
+    def build_inverted_list_with_runs(
+        self, file_paths: Iterable[str], memory_budget: int
+    ) -> Iterator[Tuple[str, List[str]]]:
+        """Build the inverted list of the collection files with sorted runs on disk
+
+        The documents of each word are kept in memory until the block holds
+        memory_budget of them. The block is then written as a run sorted by
+        term id, and the runs are merged at the end, so only the lexicon of
+        the collection is kept in memory for the whole build. The term ids
+        follow the order the words were first seen, so the words and their
+        documents come out in the same order as merge_grouped_rows.
+
+        Args:
+            file_paths (Iterable[str]): The paths of the collection files
+            memory_budget (int): The most word occurrences kept in memory
+
+        Yields:
+            Tuple[str, List[str]]: Each word and its documents
+        """
+        output_directory = os.path.dirname(os.path.abspath(self.file_path))
+        with tempfile.TemporaryDirectory(dir=output_directory) as run_directory:
+            lexicon = IdTable()
+            run_paths = self.__write_block_runs(
+                file_paths, memory_budget, lexicon, run_directory
+            )
+            if self.stemmer:
+                get_stemmer_service().report()
+            run_paths = self.__reduce_sorted_runs(run_paths, run_directory)
+
+            self.logger.info(
+                f"Merging {len(run_paths)} sorted runs of {len(lexicon)} words"
+            )
+            for term_id, documents in self.__merge_sorted_runs(run_paths):
+                yield lexicon.keys[term_id], documents
+
+    def __write_block_runs(
+        self,
+        file_paths: Iterable[str],
+        memory_budget: int,
+        lexicon: IdTable,
+        run_directory: str,
+    ) -> List[str]:
+        """Read the records into blocks, writing each full block as a sorted run
+
+        Args:
+            file_paths (Iterable[str]): The paths of the collection files
+            memory_budget (int): The most word occurrences of a block
+            lexicon (IdTable): The term id of each word, updated
+            run_directory (str): The directory of the runs
+
+        Returns:
+            List[str]: The paths of the runs, in the order they were written
+        """
+        block: Dict[int, List[str]] = {}
+        block_size = 0
+        run_paths: List[str] = []
+        for file_path in file_paths:
+            reader = DataReader(file_path)
+            for record in reader.iter_tag_elements("RECORD"):
+                block_size += self.__add_record_to_block(reader, record, lexicon, block)
+                if block_size >= memory_budget:
+                    run_paths.append(
+                        self.__write_sorted_run(block.items(), run_directory)
+                    )
+                    block = {}
+                    block_size = 0
+        if block:
+            run_paths.append(self.__write_sorted_run(block.items(), run_directory))
+        return run_paths
+
+    def __add_record_to_block(
+        self,
+        reader: DataReader,
+        record: Document,
+        lexicon: IdTable,
+        block: Dict[int, List[str]],
+    ) -> int:
+        """Add the words of a record to the block
+
+        Args:
+            reader (DataReader): The data reader
+            record (Document): The record
+            lexicon (IdTable): The term id of each word, updated
+            block (Dict[int, List[str]]): The documents of each term id, updated
+
+        Returns:
+            int: The number of word occurrences added
+        """
+        added = 0
+        for row in self.build_csv_row(reader, record):
+            word, document = row.split(self.separator)[:2]
+            if not word:
+                continue
+            block.setdefault(lexicon.add(word), []).append(document)
+            added += 1
+        return added
+
+    def __reduce_sorted_runs(
+        self, run_paths: List[str], run_directory: str
+    ) -> List[str]:
+        """Merge the runs in groups until they can be merged at once
+
+        Args:
+            run_paths (List[str]): The paths of the runs, in the order they were written
+            run_directory (str): The directory of the runs
+
+        Returns:
+            List[str]: The paths of at most MAX_MERGED_RUNS runs, in order
+        """
+        while len(run_paths) > MAX_MERGED_RUNS:
+            run_paths = [
+                self.__write_sorted_run(
+                    self.__merge_sorted_runs(run_paths[start : start + MAX_MERGED_RUNS]),
+                    run_directory,
+                )
+                for start in range(0, len(run_paths), MAX_MERGED_RUNS)
+            ]
+        return run_paths
+
+    def __write_sorted_run(
+        self, rows: Iterable[Tuple[int, List[str]]], run_directory: str
+    ) -> str:
+        """Write the documents of each term id as a run sorted by term id
+
+        Args:
+            rows (Iterable[Tuple[int, List[str]]]): The term ids and their documents
+            run_directory (str): The directory of the runs
+
+        Returns:
+            str: The path of the run
+        """
+        with tempfile.NamedTemporaryFile(
+            "w", dir=run_directory, suffix=".run", delete=False, encoding="utf-8"
+        ) as file:
+            for term_id, documents in sorted(rows, key=itemgetter(0)):
+                file.write(f"{term_id}{self.separator}{' '.join(documents)}\n")
+        self.logger.info(f"Wrote sorted run {file.name}")
+        return file.name
+
+    def __read_sorted_run(self, run_path: str) -> Iterator[Tuple[int, List[str]]]:
+        """Read a sorted run, then remove it
+
+        Args:
+            run_path (str): The path of the run
+
+        Yields:
+            Tuple[int, List[str]]: Each term id and its documents
+        """
+        with open(run_path, "r", encoding="utf-8") as file:
+            for line in file:
+                term_id, documents = line.rstrip("\n").split(self.separator)
+                yield int(term_id), documents.split(" ")
+        os.remove(run_path)
+
+    def __merge_sorted_runs(
+        self, run_paths: List[str]
+    ) -> Iterator[Tuple[int, List[str]]]:
+        """Merge sorted runs, joining the documents of each term id in run order
+
+        Args:
+            run_paths (List[str]): The paths of the runs, in the order they were written
+
+        Yields:
+            Tuple[int, List[str]]: Each term id and its documents
+        """
+        runs = [self.__read_sorted_run(run_path) for run_path in run_paths]
+        merged_rows = heapq.merge(*runs, key=itemgetter(0))
+        for term_id, rows in itertools.groupby(merged_rows, key=itemgetter(0)):
+            yield term_id, [document for _, documents in rows for document in documents]
+
+    def write_binary_index_to_file_path(self, grouped_rows: Dict[str, List[str]]):
+        """Write the grouped rows as a binary inverted index
+
+        The index holds a header with the collection statistics, the delta
+        encoded document ids with the norm of each document, the term
+        dictionary with the score upper bound of each term and the delta
+        encoded postings of every term.
+
+        Args:
+            grouped_rows (Dict[str, List[str]]): The documents of each word
+        """
+        self.write_binary_rows_to_file_path(grouped_rows.items())
+
+    def write_binary_rows_to_file_path(self, rows: Iterable[Tuple[str, List[str]]]):
+        """Write the documents of each word as a binary inverted index, reading
+        the rows one word at a time
+
+        Args:
+            rows (Iterable[Tuple[str, List[str]]]): Each word and its documents
+        """
+        self.__write_binary_postings(
+            (word, Counter(documents)) for word, documents in rows
+        )
+
+    def write_binary_postings_to_file_path(self, postings: Dict[str, Dict[str, int]]):
+        """Write the frequency of each word on each document as a binary inverted index
+
+        Args:
+            postings (Dict[str, Dict[str, int]]): The frequency of each word on
+                each document
+        """
+        self.__write_binary_postings(postings.items())
+
+    def __write_binary_postings(
+        self, postings: Iterable[Tuple[str, Mapping[str, int]]]
+    ):
+        """Write the postings of each word as a binary inverted index
+
+        The postings are encoded one word at a time into a temporary file, so
+        only the term dictionary and the document norms are kept in memory. The
+        number of documents is only known once all the words were read, so the
+        postings are also spooled as raw arrays, faster to read back than the
+        varints, and the norms and then the upper bounds are taken from them.
+
+        Args:
+            postings (Iterable[Tuple[str, Mapping[str, int]]]): Each word and
+                its frequency on each document
+        """
+        self.logger.info(f"Writing binary index to file {self.file_path}")
+        output_directory = os.path.dirname(os.path.abspath(self.file_path))
+        with tempfile.TemporaryFile(
+            dir=output_directory
+        ) as postings_file, tempfile.TemporaryFile(dir=output_directory) as spool_file:
+            (
+                terms,
+                document_id_width,
+                postings_count,
+                tokens_count,
+            ) = self.__encode_postings(postings, postings_file, spool_file)
+            number_of_documents = int(self.last_document.strip())
+            # The tfidf only depends on the document and the term frequencies,
+            # and few pairs of them repeat over the postings of both passes
+            tf_idf = lru_cache(maxsize=None)(
+                partial(calculate_tf_idf, number_of_documents)
+            )
+            spool_file.seek(0)
+            document_norms = self.__calculate_document_norms(terms, tf_idf, spool_file)
+            spool_file.seek(0)
+            dictionary = self.__encode_term_dictionary(
+                terms, tf_idf, document_norms, spool_file
+            )
+            documents_buffer = self.__encode_documents(document_norms)
+
+            dictionary_offset = BINARY_INDEX_HEADER.size + len(documents_buffer)
+            postings_offset = dictionary_offset + len(dictionary)
+            header = BINARY_INDEX_HEADER.pack(
+                BINARY_INDEX_MAGIC,
+                BINARY_INDEX_VERSION,
+                number_of_documents,
+                len(document_norms),
+                len(terms),
+                document_id_width,
+                postings_count,
+                tokens_count,
+                dictionary_offset,
+                postings_offset,
+            )
+            postings_file.seek(0)
+            with open(self.file_path, "wb") as file:
+                file.write(header)
+                file.write(documents_buffer)
+                file.write(dictionary)
+                shutil.copyfileobj(postings_file, file)
+        self.logger.info(f"Wrote {len(terms)} terms to file {self.file_path}")
+
+    def __encode_postings(
+        self,
+        postings: Iterable[Tuple[str, Mapping[str, int]]],
+        postings_file: BinaryIO,
+        spool_file: BinaryIO,
+    ) -> Tuple[List[Tuple[str, int, int]], int, int, int]:
+        """Encode the postings of each word into the postings file, and spool
+        them as raw arrays
+
+        Args:
+            postings (Iterable[Tuple[str, Mapping[str, int]]]): Each word and
+                its frequency on each document
+            postings_file (BinaryIO): The file the encoded postings go to
+            spool_file (BinaryIO): The file the document ids and the frequencies go to
+
+        Returns:
+            Tuple[List[Tuple[str, int, int]], int, int, int]: The word, the number
+                of documents and the encoded length of each term, the document
+                id width, the postings count and the tokens count
+        """
+        terms: List[Tuple[str, int, int]] = []
+        document_id_width = 0
+        postings_count = 0
+        tokens_count = 0
+        for word, frequencies in postings:
+            document_id_width = max(document_id_width, *map(len, frequencies), 0)
+            sorted_postings = sorted(
+                (int(document), frequency) for document, frequency in frequencies.items()
+            )
+            documents = [document for document, _ in sorted_postings]
+            term_frequencies = [frequency for _, frequency in sorted_postings]
+            encoded_postings = encode_postings(documents, term_frequencies)
+            postings_file.write(encoded_postings)
+            spool_file.write(array(SPOOL_TYPECODE, documents).tobytes())
+            spool_file.write(array(SPOOL_TYPECODE, term_frequencies).tobytes())
+            terms.append((word, len(sorted_postings), len(encoded_postings)))
+            postings_count += len(sorted_postings)
+            tokens_count += sum(term_frequencies)
+        return terms, document_id_width, postings_count, tokens_count
+
+    def __read_spooled_postings(
+        self, terms: List[Tuple[str, int, int]], spool_file: BinaryIO
+    ) -> Iterator[Tuple[array, array]]:
+        """Read the spooled postings of each term back, in order
+
+        Args:
+            terms (List[Tuple[str, int, int]]): The word, the number of documents
+                and the encoded length of each term
+            spool_file (BinaryIO): The spooled postings, read from the start
+
+        Yields:
+            Tuple[array, array]: The document ids and the frequencies of each term
+        """
+        for _, count, _ in terms:
+            documents = array(SPOOL_TYPECODE)
+            documents.fromfile(spool_file, count)
+            frequencies = array(SPOOL_TYPECODE)
+            frequencies.fromfile(spool_file, count)
+            yield documents, frequencies
+
+    def __calculate_document_norms(
+        self,
+        terms: List[Tuple[str, int, int]],
+        tf_idf: Callable[[int, int], float],
+        spool_file: BinaryIO,
+    ) -> Dict[int, float]:
+        """Add up the squared tfidf of the terms of each document
+
+        Args:
+            terms (List[Tuple[str, int, int]]): The word, the number of documents
+                and the encoded length of each term
+            tf_idf (Callable[[int, int], float]): The tfidf of a document
+                frequency and a term frequency
+            spool_file (BinaryIO): The spooled postings, read from the start
+
+        Returns:
+            Dict[int, float]: The squared norm of each document
+        """
+        document_norms: Dict[int, float] = {}
+        for (_, count, _), (documents, frequencies) in zip(
+            terms, self.__read_spooled_postings(terms, spool_file)
+        ):
+            for document, frequency in zip(documents, frequencies):
+                document_norms[document] = (
+                    document_norms.get(document, 0) + tf_idf(count, frequency) ** 2
+                )
+        return document_norms
+
+    def __encode_term_dictionary(
+        self,
+        terms: List[Tuple[str, int, int]],
+        tf_idf: Callable[[int, int], float],
+        document_norms: Dict[int, float],
+        spool_file: BinaryIO,
+    ) -> bytearray:
+        """Encode the term dictionary, with the upper bound of each term taken
+        from its spooled postings
+
+        Args:
+            terms (List[Tuple[str, int, int]]): The word, the number of documents
+                and the encoded length of each term
+            tf_idf (Callable[[int, int], float]): The tfidf of a document
+                frequency and a term frequency
+            document_norms (Dict[int, float]): The norm of each document
+            spool_file (BinaryIO): The spooled postings, read from the start
+
+        Returns:
+            bytearray: The term dictionary
+        """
+        dictionary = bytearray()
+        for (word, count, postings_length), (documents, frequencies) in zip(
+            terms, self.__read_spooled_postings(terms, spool_file)
+        ):
+            upper_bound = max(
+                (
+                    tf_idf(count, frequency) / document_norms[document]
+                    for document, frequency in zip(documents, frequencies)
+                    if document_norms[document] != 0
+                ),
+                default=0.0,
+            )
+            encoded_word = word.encode("utf-8")
+            encode_varint(len(encoded_word), dictionary)
+            dictionary += encoded_word
+            encode_varint(count, dictionary)
+            encode_varint(postings_length, dictionary)
+            dictionary += UPPER_BOUND.pack(upper_bound)
+        return dictionary
+
+    def __encode_documents(self, document_norms: Dict[int, float]) -> bytearray:
+        """Encode the delta encoded document ids followed by their norms
+
+        Args:
+            document_norms (Dict[int, float]): The norm of each document
+
+        Returns:
+            bytearray: The encoded documents
+        """
+        documents = sorted(document_norms)
+        documents_buffer = bytearray()
+        last_document = 0
+        for document in documents:
+            encode_varint(document - last_document, documents_buffer)
+            last_document = document
+        documents_buffer += struct.pack(
+            f"<{len(documents)}d", *(document_norms[document] for document in documents)
+        )
+        return documents_buffer
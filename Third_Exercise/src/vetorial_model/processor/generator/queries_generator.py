@@ -36,4 +36,4 @@ class QueriesGenerator(DefaultGenerator):
 
         texts = reader.get_tag_elements("QueryText", document)
         last_text = reader.get_tag_element_value(texts[-1])
-        return query_number, Normalize(last_text).normalized_text
+        return query_number, Normalize.normalize(last_text)
@@ -0,0 +1,312 @@
+import os
+from ast import literal_eval
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
+import numpy as np
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+
+# The records are sampled and written this many at a time
+CHUNK_SIZE = 10000
+MIN_RECORDNUM_WIDTH = 5
+# Each judgment has the votes of the four judges of the CF collection, 0 to 2
+JUDGES = 4
+MAX_VOTE = 2
+
+COLLECTION_HEADER = '<?xml version="1.0"?>\n<!DOCTYPE FILE SYSTEM "cfc-2.dtd">\n<FILE>\n'
+COLLECTION_FOOTER = "</FILE>\n"
+QUERIES_HEADER = (
+    '<?xml version="1.0"?>\n<!DOCTYPE FILEQUERY SYSTEM "cfcquery-2.dtd">\n<FILEQUERY>\n'
+)
+QUERIES_FOOTER = "</FILEQUERY>\n"
+
+# The query number, the word indexes and the score of each judged document
+SyntheticQuery = Tuple[int, List[int], Dict[int, str]]
+
+
+class SyntheticCorpusGenerator:
+    """Initialize the SyntheticCorpusGenerator
+
+    Writes collections and query files of any size in the schema of the CF
+    collection, cfc-2.dtd and cfcquery-2.dtd. The words are the vocabulary of
+    an inverted list of the CF collection ranked by how often they occur, and
+    the word of rank r is drawn with a probability proportional to 1 / r^s,
+    the Zipf law. The abstracts have a Poisson length with the mean of the CF
+    abstracts. The queries judge random documents, and the judged documents
+    get some words of the query planted with more votes planting more words,
+    so the searches find them. The vocabulary does not grow with the
+    collection.
+
+    Args:
+        vocabulary_path (str): The csv inverted list the term statistics are read from
+        seed (int): The seed of the random generator. Default: 0
+        exponent (float): The exponent s of the Zipf law. Default: 1.0
+    """
+
+    def __init__(self, vocabulary_path: str, seed: int = 0, exponent: float = 1.0):
+        self.logger = get_logger_with_date_output("SyntheticCorpusGenerator")
+        self.vocabulary_path = vocabulary_path
+        self.words, self.mean_document_length = self.__read_term_statistics()
+        probabilities = np.arange(1, len(self.words) + 1, dtype=float) ** -exponent
+        self.probabilities = probabilities / probabilities.sum()
+        self.random = np.random.default_rng(seed)
+
+    def __read_term_statistics(self) -> Tuple[List[str], float]:
+        """Read the words of the inverted list ranked by how often they occur
+
+        Returns:
+            Tuple[List[str], float]: The ranked words and the mean number of
+                words of a document
+        """
+        self.logger.info(f"Reading term statistics from {self.vocabulary_path}")
+        frequencies: Dict[str, int] = {}
+        documents = set()
+        with open(self.vocabulary_path, "r", encoding="utf-8") as file:
+            next(file)
+            for line in file:
+                word, documents_list = line.rstrip("\n").split(";", 1)
+                occurrences = literal_eval(documents_list)
+                frequencies[word] = len(occurrences)
+                documents.update(occurrences)
+
+        words = sorted(frequencies, key=lambda word: (-frequencies[word], word))
+        mean_document_length = sum(frequencies.values()) / max(len(documents), 1)
+        self.logger.info(
+            f"Found {len(words)} words, {mean_document_length:.1f} words a document"
+        )
+        return words, mean_document_length
+
+    def sample_words(self, size: int) -> np.ndarray:
+        """Draw words from the Zipf distribution
+
+        Args:
+            size (int): How many words are drawn
+
+        Returns:
+            np.ndarray: The indexes of the words
+        """
+        return self.random.choice(len(self.words), size=size, p=self.probabilities)
+
+    def generate_queries(
+        self,
+        number_of_queries: int,
+        number_of_documents: int,
+        mean_query_length: float = 8.0,
+        mean_judged_documents: float = 30.0,
+    ) -> List[SyntheticQuery]:
+        """Draw the words and the judged documents of the queries
+
+        Args:
+            number_of_queries (int): How many queries are drawn
+            number_of_documents (int): The number of documents of the collection
+            mean_query_length (float): The mean number of words of a query. Default: 8.0
+            mean_judged_documents (float): The mean number of judged documents of
+                a query. Default: 30.0
+
+        Returns:
+            List[SyntheticQuery]: The number, the word indexes and the score of
+                each judged document of every query
+        """
+        queries: List[SyntheticQuery] = []
+        for query_number in range(1, number_of_queries + 1):
+            words = self.sample_words(max(1, self.random.poisson(mean_query_length)))
+            judged_documents = self.random.integers(
+                1,
+                number_of_documents + 1,
+                size=max(1, self.random.poisson(mean_judged_documents)),
+            )
+            judgments = {}
+            for document in sorted(set(judged_documents.tolist())):
+                votes = self.random.integers(0, MAX_VOTE + 1, size=JUDGES)
+                if not votes.any():
+                    votes[self.random.integers(JUDGES)] = 1
+                judgments[document] = "".join(map(str, votes))
+            queries.append((query_number, words.tolist(), judgments))
+        return queries
+
+    def plant_query_words(self, queries: List[SyntheticQuery]) -> Dict[int, List[int]]:
+        """Choose the words of the queries planted in their judged documents
+
+        A judged document gets one word of the query for each judge that
+        voted for it.
+
+        Args:
+            queries (List[SyntheticQuery]): The queries
+
+        Returns:
+            Dict[int, List[int]]: The word indexes planted in each document
+        """
+        planted_words: Dict[int, List[int]] = {}
+        for _, words, judgments in queries:
+            for document, score in judgments.items():
+                votes = len(score) - score.count("0")
+                planted_words.setdefault(document, []).extend(
+                    self.random.choice(words, size=votes).tolist()
+                )
+        return planted_words
+
+    def __format_record(
+        self, record_number: int, width: int, title: List[str], abstract: List[str]
+    ) -> str:
+        """Format a record of the collection
+
+        Args:
+            record_number (int): The RECORDNUM
+            width (int): The zero padded width of the RECORDNUM
+            title (List[str]): The words of the title
+            abstract (List[str]): The words of the abstract
+
+        Returns:
+            str: The record
+        """
+        return (
+            "\t<RECORD>\n"
+            f"\t\t<PAPERNUM>PN{record_number:0{width}d}</PAPERNUM>\n"
+            f"\t\t<RECORDNUM>{record_number:0{width}d} </RECORDNUM>\n"
+            f"\t\t<MEDLINENUM>{record_number}</MEDLINENUM>\n"
+            "\t\t<AUTHORS>\n\t\t\t<AUTHOR>Synthetic-A</AUTHOR>\n\t\t</AUTHORS>\n"
+            f"\t\t<TITLE>{escape(' '.join(title))}</TITLE>\n"
+            "\t\t<SOURCE>Synthetic collection.</SOURCE>\n"
+            f"\t\t<ABSTRACT>{escape(' '.join(abstract))}</ABSTRACT>\n"
+            "\t</RECORD>\n"
+        )
+
+    def write_collection(
+        self,
+        directory: str,
+        number_of_documents: int,
+        records_per_file: int,
+        planted_words: Dict[int, List[int]],
+        mean_title_length: float = 10.0,
+    ) -> List[str]:
+        """Write the collection files, drawing the records a chunk at a time
+
+        Args:
+            directory (str): The directory of the collection files
+            number_of_documents (int): How many records are written
+            records_per_file (int): How many records each file holds
+            planted_words (Dict[int, List[int]]): The word indexes planted in
+                each document
+            mean_title_length (float): The mean number of words of a title. Default: 10.0
+
+        Returns:
+            List[str]: The paths of the collection files
+        """
+        width = max(MIN_RECORDNUM_WIDTH, len(str(number_of_documents)))
+        number_of_files = -(-number_of_documents // records_per_file)
+        file_paths = []
+        for file_index in range(number_of_files):
+            file_path = os.path.join(
+                directory, f"synthetic{file_index + 1:0{len(str(number_of_files))}d}.xml"
+            )
+            first_document = file_index * records_per_file + 1
+            last_document = min(first_document + records_per_file, number_of_documents + 1)
+            self.logger.info(
+                f"Writing records {first_document} to {last_document - 1} to {file_path}"
+            )
+            with open(file_path, "w", encoding="utf-8") as file:
+                file.write(COLLECTION_HEADER)
+                for chunk_start in range(first_document, last_document, CHUNK_SIZE):
+                    chunk_end = min(chunk_start + CHUNK_SIZE, last_document)
+                    file.writelines(
+                        self.__generate_records(
+                            chunk_start, chunk_end, width, planted_words, mean_title_length
+                        )
+                    )
+                file.write(COLLECTION_FOOTER)
+            file_paths.append(file_path)
+        return file_paths
+
+    def __generate_records(
+        self,
+        first_document: int,
+        last_document: int,
+        width: int,
+        planted_words: Dict[int, List[int]],
+        mean_title_length: float,
+    ) -> List[str]:
+        """Draw a chunk of records with a single sample of the words
+
+        Args:
+            first_document (int): The RECORDNUM of the first record
+            last_document (int): The RECORDNUM after the last record
+            width (int): The zero padded width of the RECORDNUM
+            planted_words (Dict[int, List[int]]): The word indexes planted in
+                each document
+            mean_title_length (float): The mean number of words of a title
+
+        Returns:
+            List[str]: The formatted records
+        """
+        size = last_document - first_document
+        title_lengths = np.maximum(self.random.poisson(mean_title_length, size), 1)
+        abstract_lengths = np.maximum(
+            self.random.poisson(self.mean_document_length, size), 1
+        )
+        lengths = np.column_stack((title_lengths, abstract_lengths)).ravel()
+        words = [self.words[index] for index in self.sample_words(int(lengths.sum()))]
+        bounds = np.concatenate(([0], np.cumsum(lengths))).tolist()
+
+        records = []
+        for position, record_number in enumerate(range(first_document, last_document)):
+            title = words[bounds[2 * position] : bounds[2 * position + 1]]
+            abstract = words[bounds[2 * position + 1] : bounds[2 * position + 2]]
+            abstract += [self.words[index] for index in planted_words.get(record_number, ())]
+            records.append(self.__format_record(record_number, width, title, abstract))
+        return records
+
+    def write_queries(self, file_path: str, queries: List[SyntheticQuery]):
+        """Write the query file
+
+        Args:
+            file_path (str): The path of the query file
+            queries (List[SyntheticQuery]): The queries
+        """
+        self.logger.info(f"Writing {len(queries)} queries to {file_path}")
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(QUERIES_HEADER)
+            for query_number, words, judgments in queries:
+                query_text = escape(" ".join(self.words[index] for index in words))
+                file.write(
+                    "\t<QUERY>\n"
+                    f"\t\t<QueryNumber>{query_number:05d}</QueryNumber>\n"
+                    f"\t\t<QueryText>{query_text}</QueryText>\n"
+                    f"\t\t<Results>{len(judgments):05d}</Results>\n"
+                    "\t\t<Records>\n"
+                )
+                file.writelines(
+                    f'\t\t\t<Item score="{score}">{document}</Item>\n'
+                    for document, score in judgments.items()
+                )
+                file.write("\t\t</Records>\n\t</QUERY>\n")
+            file.write(QUERIES_FOOTER)
+
+    def generate(
+        self,
+        directory: str,
+        number_of_documents: int,
+        number_of_queries: int,
+        records_per_file: int,
+    ) -> Tuple[List[str], str]:
+        """Write a collection and its queries
+
+        Args:
+            directory (str): The directory of the files
+            number_of_documents (int): How many records are written
+            number_of_queries (int): How many queries are written
+            records_per_file (int): How many records each collection file holds
+
+        Returns:
+            Tuple[List[str], str]: The paths of the collection files and of the
+                query file
+        """
+        os.makedirs(directory, exist_ok=True)
+        queries = self.generate_queries(number_of_queries, number_of_documents)
+        collection_paths = self.write_collection(
+            directory,
+            number_of_documents,
+            records_per_file,
+            self.plant_query_words(queries),
+        )
+        queries_path = os.path.join(directory, "queries.xml")
+        self.write_queries(queries_path, queries)
+        return collection_paths, queries_path
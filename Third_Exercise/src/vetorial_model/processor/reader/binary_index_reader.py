@@ -0,0 +1,156 @@
+import mmap
+import struct
+from typing import Dict, List, Tuple, Union
+from vetorial_model.processor.reader.default import DefaultReader
+from vetorial_model.utils.binary_index_utils import (
+    BINARY_INDEX_HEADER,
+    BINARY_INDEX_MAGIC,
+    BINARY_INDEX_VERSION,
+    UPPER_BOUND,
+    decode_postings,
+    decode_varint,
+)
+
+
+class BinaryIndexReader(DefaultReader):
+    """Initialize the BinaryIndexReader
+
+    Args:
+        file_path (str): The path of the binary inverted index.
+        memory_map (bool): If the index should be memory mapped instead of
+            read into memory. Default: False
+    """
+
+    def __init__(self, file_path: str, memory_map: bool = False):
+        super().__init__(file_path)
+        super().setup_reader_logger("BinaryIndexReader")
+        self.buffer = self.__read_buffer(memory_map)
+        self.__read_header()
+        self.document_ids, self.document_norms = self.__read_documents()
+        self.documents = [
+            f"{document:0{self.document_id_width}d}" for document in self.document_ids
+        ]
+        self.upper_bounds: Dict[str, float] = {}
+        self.terms = self.__read_term_dictionary()
+
+    def __read_buffer(self, memory_map: bool) -> Union[bytes, mmap.mmap]:
+        """Read the whole binary index, or map it into memory
+
+        Args:
+            memory_map (bool): If the index should be memory mapped
+
+        Returns:
+            Union[bytes, mmap.mmap]: The binary index
+        """
+        self.logger.info(f"Reading binary index {self.file_path}")
+        with open(self.file_path, "rb") as file:
+            if memory_map:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            return file.read()
+
+    def __read_header(self):
+        """Read the header with the collection statistics"""
+        (
+            magic,
+            version,
+            self.number_of_documents,
+            self.documents_count,
+            self.terms_count,
+            self.document_id_width,
+            self.postings_count,
+            self.tokens_count,
+            self.dictionary_offset,
+            self.postings_offset,
+        ) = BINARY_INDEX_HEADER.unpack_from(self.buffer, 0)
+        if magic != BINARY_INDEX_MAGIC or not 1 <= version <= BINARY_INDEX_VERSION:
+            raise ValueError(f"{self.file_path} is not a binary index")
+        self.version = version
+
+    def __read_documents(self) -> Tuple[List[int], List[float]]:
+        """Read the document ids and their norms
+
+        Returns:
+            Tuple[List[int], List[float]]: The document ids and the norm of each one
+        """
+        position = BINARY_INDEX_HEADER.size
+        documents = []
+        document = 0
+        for _ in range(self.documents_count):
+            delta, position = decode_varint(self.buffer, position)
+            document += delta
+            documents.append(document)
+
+        document_norms = list(
+            struct.unpack_from(f"<{self.documents_count}d", self.buffer, position)
+        )
+        return documents, document_norms
+
+    def __read_term_dictionary(self) -> Dict[str, Tuple[int, int, int]]:
+        """Read the term dictionary, and the upper bound of each term from version 2 on
+
+        Returns:
+            Dict[str, Tuple[int, int, int]]: The number of documents, the postings
+                position and the postings length of each term
+        """
+        terms = {}
+        position = self.dictionary_offset
+        postings_position = self.postings_offset
+        for _ in range(self.terms_count):
+            length, position = decode_varint(self.buffer, position)
+            term = self.buffer[position : position + length].decode("utf-8")
+            position += length
+            count, position = decode_varint(self.buffer, position)
+            postings_length, position = decode_varint(self.buffer, position)
+            if self.version >= 2:
+                (self.upper_bounds[term],) = UPPER_BOUND.unpack_from(
+                    self.buffer, position
+                )
+                position += UPPER_BOUND.size
+            terms[term] = (count, postings_position, postings_length)
+            postings_position += postings_length
+        self.logger.info(f"Found {len(terms)} terms")
+        return terms
+
+    def read_postings_ids(self, term: str) -> Tuple[List[int], List[int]]:
+        """Read the postings of a term as document ids
+
+        Args:
+            term (str): The term
+
+        Returns:
+            Tuple[List[int], List[int]]: The document ids and the frequencies
+        """
+        if term not in self.terms:
+            return [], []
+
+        count, position, _ = self.terms[term]
+        return decode_postings(self.buffer, position, count)
+
+    def read_postings(self, term: str) -> Dict[str, int]:
+        """Read the postings of a term
+
+        Args:
+            term (str): The term
+
+        Returns:
+            Dict[str, int]: The frequency of the term on each document
+        """
+        documents, frequencies = self.read_postings_ids(term)
+        return {
+            f"{document:0{self.document_id_width}d}": frequency
+            for document, frequency in zip(documents, frequencies)
+        }
+
+    def read_all_postings(self) -> Dict[str, Dict[str, int]]:
+        """Read the postings of every term, in the order they were written
+
+        Returns:
+            Dict[str, Dict[str, int]]: The postings of each term
+        """
+        self.logger.info("Reading all postings")
+        return {term: self.read_postings(term) for term in self.terms}
+
+    def close(self):
+        """Unmap the binary index, when it was memory mapped"""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
@@ -19,6 +19,9 @@ class ConfigurationReader(DefaultReader):
         self.model = self.get_configuration_attribute("MODELO")
         self.results = self.get_configuration_attribute("RESULTADOS")
         self.stemmer = self.get_configuration_attribute("STEMMER")
+        self.processes = self.get_configuration_attribute("PROCESSOS")
+        self.top_k = self.get_configuration_attribute("TOPK")
+        self.memory_budget = self.get_configuration_attribute("MEMORIA")
 
     def define_stemmer(self, stemmer: str) -> bool:
         """Define if the stemmer is used
@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import Iterator, Optional, Union
 from xml.dom.minidom import Document, Element, parse
+from xml.etree import ElementTree
 from vetorial_model.processor.reader.default import DefaultReader
 
 
@@ -27,12 +28,16 @@ class DataReader(DefaultReader):
 
         return parse(self.file_path)
 
-    def get_tag_elements(self, tag_name: str, xml_doc: Optional[Document] = None):
+    def get_tag_elements(
+        self,
+        tag_name: str,
+        xml_doc: Optional[Union[Document, ElementTree.Element]] = None,
+    ):
         """Get the tag elements
 
         Args:
             tag_name (str): The name of the tag
-            xml_doc (Document): The xml file
+            xml_doc (Union[Document, ElementTree.Element]): The xml file or a streamed element
 
         Returns:
             list: The tag elements
@@ -42,37 +47,77 @@ class DataReader(DefaultReader):
         if xml_doc is None and not self.file_path:
             raise Exception("Xml file not found")
 
-        document = xml_doc or self.__read_xml_doc()
-        tag_elements = document.getElementsByTagName(tag_name)
+        document = xml_doc if xml_doc is not None else self.__read_xml_doc()
+        if isinstance(document, ElementTree.Element):
+            tag_elements = document.findall(f".//{tag_name}")
+        else:
+            tag_elements = document.getElementsByTagName(tag_name)
         self.logger.info(f"Found {len(tag_elements)} tag elements")
         return tag_elements
 
+    def iter_tag_elements(self, tag_name: str) -> Iterator[ElementTree.Element]:
+        """Stream the tag elements of the xml file one at a time
+
+        The file is read incrementally and every element is dropped from the
+        tree once it has been yielded, so the memory used does not grow with
+        the size of the file.
+
+        Args:
+            tag_name (str): The name of the tag
+
+        Yields:
+            ElementTree.Element: The tag elements
+        """
+        if not self.file_path:
+            raise Exception("Xml file not found")
+
+        self.logger.info(f"Streaming tag elements {tag_name} from {self.file_path}")
+        root = None
+        for event, element in ElementTree.iterparse(
+            self.file_path, events=("start", "end")
+        ):
+            if root is None:
+                root = element
+            if event == "end" and element.tag == tag_name:
+                yield element
+                root.clear()
+
     def get_tag_element_value(self, tag_element):
         """Get the tag element value
 
         Args:
-            tag_element (xml.dom.minidom.Element): The tag element
+            tag_element (Union[Element, ElementTree.Element]): The tag element
 
         Returns:
             str: The tag element value
         """
+        if isinstance(tag_element, ElementTree.Element):
+            self.logger.info(f"Reading tag element value {tag_element.tag}")
+            return tag_element.text
+
         self.logger.info(f"Reading tag element value {tag_element.nodeName}")
         if tag_element.firstChild is None:
             return None
         return tag_element.firstChild.data
 
     def get_tag_element_attribute_value(
-        self, tag_element: Element, attribute_name: str
+        self, tag_element: Union[Element, ElementTree.Element], attribute_name: str
     ):
         """Get the tag element attribute value
 
         Args:
-            tag_element (Element): The tag element
+            tag_element (Union[Element, ElementTree.Element]): The tag element
             attribute_name (str): The name of the attribute
 
         Returns:
             str: The tag element attribute value
         """
+        if isinstance(tag_element, ElementTree.Element):
+            self.logger.info(
+                f"Reading tag element attribute value {tag_element.tag} {attribute_name}"
+            )
+            return tag_element.get(attribute_name, "")
+
         self.logger.info(
             f"Reading tag element attribute value {tag_element.nodeName} {attribute_name}"
         )
@@ -0,0 +1,84 @@
+import ast
+from typing import TYPE_CHECKING
+from vetorial_model.processor.reader.default import DefaultReader
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SEARCH_RESULT_COLUMNS = ["QUERY", "RANK", "DOCUMENT", "SCORE"]
+SEARCH_RESULT_DTYPES = {
+    "QUERY": "int32",
+    "RANK": "int32",
+    "DOCUMENT": "int32",
+    "SCORE": "float64",
+}
+LEGACY_SEARCH_RESULT_HEADER = "Query;Ranking"
+
+
+class SearchResultReader(DefaultReader):
+    """Initialize the SearchResultReader
+
+    Reads the search result written by SearchEngine.write_search_result, one
+    QUERY;RANK;DOCUMENT;SCORE row per ranked document, into a typed dataframe.
+    The former format, with the whole ranking of a query as a list in one
+    cell, is still read.
+
+    Args:
+        file_path (str): The path of the search result.
+    """
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        super().setup_reader_logger("SearchResultReader")
+
+    def is_legacy_format(self) -> bool:
+        """Check if the search result has a whole ranking in each row
+
+        Returns:
+            bool: If the search result has the Query;Ranking header
+        """
+        with self.read_file() as file:
+            return file.readline().strip() == LEGACY_SEARCH_RESULT_HEADER
+
+    def read(self) -> "pd.DataFrame":
+        """Read the search result
+
+        Returns:
+            pd.DataFrame: The QUERY, RANK, DOCUMENT and SCORE of each ranked document
+        """
+        import pandas as pd
+
+        self.logger.info(f"Reading search result {self.file_path}")
+        if self.is_legacy_format():
+            return self.__read_legacy_format()
+        return pd.read_csv(
+            self.file_path,
+            sep=";",
+            dtype=SEARCH_RESULT_DTYPES,
+            float_precision="round_trip",
+        )
+
+    def __read_legacy_format(self) -> "pd.DataFrame":
+        """Read a search result with the whole ranking of a query in each row
+
+        Returns:
+            pd.DataFrame: The QUERY, RANK, DOCUMENT and SCORE of each ranked document
+        """
+        import pandas as pd
+
+        self.logger.warning(
+            f"{self.file_path} has the former Query;Ranking format, "
+            "every ranking is parsed with ast.literal_eval"
+        )
+        rows = []
+        with self.read_file() as file:
+            next(file)
+            for line in file:
+                query, ranking = line.split(";", 1)
+                rows.extend(
+                    (int(query), rank, int(document), score)
+                    for rank, document, score in ast.literal_eval(ranking)
+                )
+        return pd.DataFrame(rows, columns=SEARCH_RESULT_COLUMNS).astype(
+            SEARCH_RESULT_DTYPES
+        )
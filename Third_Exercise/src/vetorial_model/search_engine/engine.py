@@ -1,21 +1,54 @@
+import heapq
+import os
 import time
-from typing import Any, Dict, List
+from array import array
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+from vetorial_model.processor.reader.binary_index_reader import BinaryIndexReader
+from vetorial_model.processor.reader.search_result_reader import SEARCH_RESULT_COLUMNS
+from vetorial_model.search_engine.lazy_postings import LazyPostings
+from vetorial_model.search_engine.max_score import MaxScoreEvaluator
+from vetorial_model.search_engine.term_postings import TermPostings
+from vetorial_model.stemmer.stemmer_service import get_stemmer_service
 from vetorial_model.utils.logger_utils import get_logger_with_date_output
 from vetorial_model.utils.normalizer_utils import Normalize
+from vetorial_model.utils.shared import calculate_tf_idf, get_document_norms_path
+
+if TYPE_CHECKING:
+    from vetorial_model.indexer.segmented_index import SegmentedIndex
 
 
 class SearchEngine:
-    def __init__(self, documents_list: List[str]):
+    def __init__(self, documents_list: List[str], stemmer: bool = False):
         self.logger = get_logger_with_date_output("SearchEngine")
         self.documents_list = documents_list
+        self.stemmer = stemmer
         self.query_token_dictionary: Dict[str, Any] = {}
         self.term_value_dictionary: Dict[str, Any] = {}
+        self.postings: Mapping[str, TermPostings] = {}
+        self.document_norms: List[float] = []
+        self.upper_bounds: Mapping[str, float] = {}
+        self.max_score_evaluator: Optional[MaxScoreEvaluator] = None
 
     def read_tf_idf_table_and_generate_term_value_dictionary(
         self, file_path: str
     ) -> dict:
         """Read the tfidf table and generate the term value dictionary
 
+        The documents list is taken from the header of the table when the
+        engine was created without one. The values of each term are kept as
+        a float64 array.
+
         Args:
             file_path (str): The file path
 
@@ -26,15 +59,159 @@ class SearchEngine:
 
         term_value_dictionary = {}
         with open(file_path, "r", encoding="utf_8") as file:
-            lines = file.readlines()[1:]
+            header, *lines = file.readlines()
+            if not self.documents_list:
+                self.documents_list = header.strip().split(";")[1:]
             for line in lines:
                 line = line.strip()
                 term, *tfidf = line.split(";")
-                term_value_dictionary[term] = list(map(float, tfidf))
+                term_value_dictionary[term] = array("d", map(float, tfidf))
         self.logger.info("Tfidf table read")
         self.term_value_dictionary = term_value_dictionary
+        self.postings = self.__generate_postings(term_value_dictionary)
+        self.upper_bounds = {}
+        self.max_score_evaluator = None
+
+        norms_path = get_document_norms_path(file_path)
+        if os.path.exists(norms_path):
+            self.document_norms = self.__read_document_norms(norms_path)
+        else:
+            self.document_norms = self.__calculate_document_norms(
+                term_value_dictionary
+            )
         return term_value_dictionary
 
+    def read_binary_index_and_generate_postings(
+        self, file_path: str, lazy: bool = False
+    ) -> Mapping[str, TermPostings]:
+        """Read a binary inverted index and generate the tfidf postings
+
+        The documents list and the document norms are taken from the index.
+        In the lazy mode the index is memory mapped and the postings of a term
+        are only decoded the first time a query uses it.
+
+        Args:
+            file_path (str): The file path
+            lazy (bool): If the postings should be decoded on demand. Default: False
+
+        Returns:
+            Mapping[str, TermPostings]: The (document index, tfidf) pairs of each term
+        """
+        self.logger.info("Reading binary index")
+        reader = BinaryIndexReader(file_path, memory_map=lazy)
+        self.documents_list = reader.documents
+        self.document_norms = reader.document_norms
+        self.upper_bounds = reader.upper_bounds
+        self.max_score_evaluator = None
+        if lazy:
+            self.postings = LazyPostings(reader)
+            self.logger.info("Binary index mapped")
+            return self.postings
+
+        document_indexes = {
+            document: index for index, document in enumerate(reader.document_ids)
+        }
+
+        postings = {}
+        for term in reader.terms:
+            documents, frequencies = reader.read_postings_ids(term)
+            postings[term] = TermPostings(
+                (document_indexes[document] for document in documents),
+                (
+                    calculate_tf_idf(
+                        reader.number_of_documents, len(documents), frequency
+                    )
+                    for frequency in frequencies
+                ),
+            )
+        self.logger.info("Binary index read")
+        self.postings = postings
+        return postings
+
+    def read_segmented_index_and_generate_postings(
+        self, segmented_index: "SegmentedIndex"
+    ) -> Mapping[str, TermPostings]:
+        """Generate the tfidf postings of the live documents of a segmented index
+
+        The documents list and the document norms are taken from the index.
+        The index is read again after records are added or deleted.
+
+        Args:
+            segmented_index (SegmentedIndex): The segmented index
+
+        Returns:
+            Mapping[str, TermPostings]: The (document index, tfidf) pairs of each term
+        """
+        self.logger.info("Reading segmented index")
+        (
+            self.documents_list,
+            self.postings,
+            self.document_norms,
+        ) = segmented_index.read_postings()
+        self.upper_bounds = {}
+        self.max_score_evaluator = None
+        self.logger.info("Segmented index read")
+        return self.postings
+
+    def __read_document_norms(self, file_path: str) -> List[float]:
+        """Read the document norms persisted alongside the model
+
+        Args:
+            file_path (str): The file path
+
+        Returns:
+            List[float]: The norm of each document, indexed as the documents list
+        """
+        self.logger.info(f"Reading document norms from {file_path}")
+        document_norms = {}
+        with open(file_path, "r", encoding="utf_8") as file:
+            lines = file.readlines()[1:]
+            for line in lines:
+                document, norm = line.strip().split(";")
+                document_norms[document] = float(norm)
+        self.logger.info("Document norms read")
+        return [document_norms[document] for document in self.documents_list]
+
+    def __generate_postings(
+        self, term_value_dictionary: Dict[str, array]
+    ) -> Dict[str, TermPostings]:
+        """Generate the postings of every term, keeping only the non zero values
+
+        Args:
+            term_value_dictionary (Dict[str, array]): The term value dictionary
+
+        Returns:
+            Dict[str, TermPostings]: The (document index, tfidf) pairs of each term
+        """
+        self.logger.info("Generating postings")
+        postings = {}
+        for term, values in term_value_dictionary.items():
+            postings[term] = TermPostings.from_pairs(
+                (index, value) for index, value in enumerate(values) if value != 0
+            )
+        self.logger.info("Postings generated")
+        return postings
+
+    def __calculate_document_norms(
+        self, term_value_dictionary: Dict[str, array]
+    ) -> List[float]:
+        """Calculate the sum of the squared tfidf values of every document
+
+        Args:
+            term_value_dictionary (Dict[str, array]): The term value dictionary
+
+        Returns:
+            List[float]: The norm of each document, indexed as the documents list
+        """
+        self.logger.info("Calculating document norms")
+        document_norms = [0.0] * len(self.documents_list)
+        for values in term_value_dictionary.values():
+            for index, value in enumerate(values):
+                if value != 0:
+                    document_norms[index] += value**2
+        self.logger.info("Document norms calculated")
+        return document_norms
+
     def read_queries_and_generate_query_token_dictionary(self, file_path: str) -> dict:
         """Read the queries and generate the query token dictionary
 
@@ -49,11 +226,28 @@ class SearchEngine:
             lines = file.readlines()[1:]
             for line in lines:
                 query, text = line.split(";")
-                query_token_dictionary[query] = Normalize(text).tokenized_text
+                query_token_dictionary[query] = self.tokenize(text)
         self.logger.info("Queries read")
+        if self.stemmer:
+            get_stemmer_service().report()
         self.query_token_dictionary = query_token_dictionary
         return query_token_dictionary
 
+    def tokenize(self, text: str) -> List[str]:
+        """Tokenize a query text, stemming the tokens when the model is stemmed
+
+        Args:
+            text (str): The query text
+
+        Returns:
+            List[str]: The tokens
+        """
+        tokens = Normalize(text).tokenized_text
+        if self.stemmer:
+            stemmer_service = get_stemmer_service()
+            tokens = [stemmer_service.stem(token) for token in tokens]
+        return tokens
+
     def calculate_similarity_between(self, tokens: List[str], index: int) -> float:
         """Calculate the similarity between the tokens and the document
 
@@ -69,54 +263,287 @@ class SearchEngine:
             if token in self.term_value_dictionary:
                 similarity += self.term_value_dictionary[token][index]
 
-        denominator: float = 0
-        for _, indexes in self.term_value_dictionary.items():
-            denominator += indexes[index] ** 2
-
+        denominator = self.document_norms[index]
         if denominator == 0:
             return 0
         return similarity / denominator
 
-    def search_documents(self) -> dict:
+    def calculate_similarities(self, tokens: List[str]) -> List[float]:
+        """Calculate the similarity between the tokens and every document,
+        walking only the postings of the tokens
+
+        Args:
+            tokens (List[str]): The tokens
+
+        Returns:
+            List[float]: The similarities, indexed as the documents list
+        """
+        accumulator = [0.0] * len(self.documents_list)
+        for token in tokens:
+            for index, value in self.postings.get(token, []):
+                accumulator[index] += value
+
+        return [
+            similarity / denominator if denominator != 0 else 0
+            for similarity, denominator in zip(accumulator, self.document_norms)
+        ]
+
+    def __rank(
+        self, similarities: List[float], top_k: Optional[int] = None
+    ) -> List[List[Any]]:
+        """Rank the documents by their similarity
+
+        With top_k only the documents with a non zero similarity are candidates,
+        and the best ones are selected with a bounded heap instead of sorting
+        the whole collection. Ties keep the order of the documents list in both
+        cases.
+
+        Args:
+            similarities (List[float]): The similarities, indexed as the documents list
+            top_k (Optional[int]): How many documents are kept. Default: None, which
+                keeps all of them
+
+        Returns:
+            List[List[Any]]: The [rank, document, similarity] of each document
+        """
+        if top_k is not None:
+            candidates = (
+                (index, similarity)
+                for index, similarity in enumerate(similarities)
+                if similarity != 0
+            )
+            return [
+                [rank, self.documents_list[index], similarity]
+                for rank, (index, similarity) in enumerate(
+                    heapq.nlargest(top_k, candidates, key=lambda x: x[1]), start=1
+                )
+            ]
+
+        ranking = [
+            [0, document, similarity]
+            for document, similarity in zip(self.documents_list, similarities)
+        ]
+
+        ranking.sort(key=lambda x: x[2], reverse=True)
+        for i in range(len(ranking)):
+            ranking[i][0] = i + 1
+        return ranking
+
+    def get_max_score_evaluator(self) -> MaxScoreEvaluator:
+        """Get the MaxScore evaluator of the postings read
+
+        Returns:
+            MaxScoreEvaluator: The evaluator
+        """
+        if self.max_score_evaluator is None:
+            self.max_score_evaluator = MaxScoreEvaluator(
+                self.postings, self.document_norms, self.upper_bounds
+            )
+        return self.max_score_evaluator
+
+    def __search_tokens(
+        self, tokens: List[str], top_k: Optional[int] = None, pruning: bool = False
+    ) -> List[List[Any]]:
+        """Rank the documents for the query tokens
+
+        Args:
+            tokens (List[str]): The query tokens
+            top_k (Optional[int]): How many documents are kept. Default: None, which
+                keeps all of them
+            pruning (bool): If the top k should be selected with the MaxScore
+                dynamic pruning, which gives the same documents. Default: False
+
+        Returns:
+            List[List[Any]]: The [rank, document, similarity] of each document
+        """
+        if pruning and top_k is not None:
+            ranking, _ = self.get_max_score_evaluator().evaluate(tokens, top_k)
+            return [
+                [rank, self.documents_list[index], similarity]
+                for rank, (index, similarity) in enumerate(ranking, start=1)
+            ]
+        return self.__rank(self.calculate_similarities(tokens), top_k)
+
+    def search_query(
+        self, text: str, top_k: Optional[int] = None, pruning: bool = False
+    ) -> List[List[Any]]:
+        """Search a single query text
+
+        Args:
+            text (str): The query text
+            top_k (Optional[int]): How many documents are returned. Default: None,
+                which returns all of them
+            pruning (bool): If the top k should be selected with the MaxScore
+                dynamic pruning. Default: False
+
+        Returns:
+            List[List[Any]]: The [rank, document, similarity] of each document
+        """
+        return self.__search_tokens(self.tokenize(text), top_k, pruning)
+
+    def search_documents(
+        self, top_k: Optional[int] = None, pruning: bool = False
+    ) -> dict:
         """Search the query token dictionary
 
+        Args:
+            top_k (Optional[int]): How many documents are kept for each query, only
+                the ones with a non zero similarity. Default: None, which keeps
+                every document
+            pruning (bool): If the top k should be selected with the MaxScore
+                dynamic pruning. Default: False
+
         Returns:
             dict: The search result
         """
+        return dict(self.iter_search_documents(top_k, pruning))
+
+    def iter_search_documents(
+        self, top_k: Optional[int] = None, pruning: bool = False
+    ) -> Iterator[Tuple[str, List[List[Any]]]]:
+        """Search the query token dictionary one query at a time
+
+        Args:
+            top_k (Optional[int]): How many documents are kept for each query, only
+                the ones with a non zero similarity. Default: None, which keeps
+                every document
+            pruning (bool): If the top k should be selected with the MaxScore
+                dynamic pruning. Default: False
+
+        Yields:
+            Tuple[str, List[List[Any]]]: Each query and its [rank, document,
+                similarity] rows
+        """
         self.logger.info("Searching")
-        search_result: Dict[str, List[Any]] = {}
         for query, tokens in self.query_token_dictionary.items():
             self.logger.info(f"Searching query {query}")
             start_time = time.time()
-            search_result[query] = []
-            for index, document in enumerate(self.documents_list):
-                search_result[query].append(
-                    [
-                        0,
-                        document,
-                        self.calculate_similarity_between(tokens, index),
-                    ]
-                )
-
-            search_result[query].sort(key=lambda x: x[2], reverse=True)
-            for i in range(len(search_result[query])):
-                search_result[query][i][0] = i + 1
+            ranking = self.__search_tokens(tokens, top_k, pruning)
 
             self.logger.info(
                 f"Query {query} took {round(time.time() - start_time, 2)} seconds"
             )
+            yield query, ranking
+
+    def search_documents_batch(self, top_k: Optional[int] = None) -> dict:
+        """Search the query token dictionary with a single sparse matrix product
+
+        The queries become a query x term matrix, with one entry for every
+        token in the order of the tokens, which is multiplied by the term x
+        document tfidf matrix of the query terms and divided by the document
+        norms. The sums are made in the same order as calculate_similarities,
+        so the result is the same as search_documents.
+
+        Args:
+            top_k (Optional[int]): How many documents are kept for each query, only
+                the ones with a non zero similarity. Default: None, which keeps
+                every document
+
+        Returns:
+            dict: The search result
+        """
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        self.logger.info("Searching in batch")
+        start_time = time.time()
+        queries = list(self.query_token_dictionary)
+        terms: Dict[str, int] = {}
+        query_terms: List[int] = []
+        query_pointers = [0]
+        for query in queries:
+            for token in self.query_token_dictionary[query]:
+                if token in self.postings:
+                    query_terms.append(terms.setdefault(token, len(terms)))
+            query_pointers.append(len(query_terms))
+        query_matrix = csr_matrix(
+            (np.ones(len(query_terms)), query_terms, query_pointers),
+            shape=(len(queries), len(terms)),
+        )
+
+        term_postings = [self.postings[term] for term in terms]
+        term_pointers = np.cumsum([0] + [len(postings) for postings in term_postings])
+        tf_idf_matrix = csr_matrix(
+            (
+                np.concatenate(
+                    [np.frombuffer(postings.values) for postings in term_postings]
+                    or [np.zeros(0)]
+                ),
+                np.concatenate(
+                    [
+                        np.frombuffer(postings.documents, dtype=np.intc)
+                        for postings in term_postings
+                    ]
+                    or [np.zeros(0, dtype=np.intc)]
+                ),
+                term_pointers,
+            ),
+            shape=(len(terms), len(self.documents_list)),
+        )
+        similarity_matrix = (query_matrix @ tf_idf_matrix).tocsr()
+
+        document_norms = np.array(self.document_norms, dtype=float)
+        zero_norms = np.flatnonzero(document_norms == 0)
+        search_result: Dict[str, List[Any]] = {}
+        for row, query in enumerate(queries):
+            row_start, row_end = similarity_matrix.indptr[row : row + 2]
+            accumulator = np.zeros(len(self.documents_list))
+            accumulator[
+                similarity_matrix.indices[row_start:row_end]
+            ] = similarity_matrix.data[row_start:row_end]
+            similarity_array = np.divide(
+                accumulator,
+                document_norms,
+                out=np.zeros_like(accumulator),
+                where=document_norms != 0,
+            )
 
+            # A stable sort of the negated similarities keeps the ties in the
+            # order of the documents list, as the sort of __rank
+            if top_k is not None:
+                candidates = np.flatnonzero(similarity_array)
+                order = candidates[
+                    np.argsort(-similarity_array[candidates], kind="stable")[:top_k]
+                ]
+            else:
+                order = np.argsort(-similarity_array, kind="stable")
+            similarities = similarity_array.tolist()
+            for index in zero_norms:
+                similarities[index] = 0
+            search_result[query] = [
+                [rank, self.documents_list[index], similarities[index]]
+                for rank, index in enumerate(order.tolist(), start=1)
+            ]
+
+        self.logger.info(
+            f"{len(queries)} queries took {round(time.time() - start_time, 2)} seconds"
+        )
         return search_result
 
-    def write_search_result(self, search_result: dict, file_path: str):
-        """Write the search result to the file
+    def write_search_result(
+        self,
+        search_result: Union[
+            Mapping[str, List[List[Any]]], Iterable[Tuple[str, List[List[Any]]]]
+        ],
+        file_path: str,
+    ):
+        """Write the search result to the file, one row per query and ranked document
+
+        The rows are written as the rankings come, so the rankings of an
+        iter_search_documents search are never held all at once.
 
         Args:
-            search_result (dict): The search result
+            search_result (Union[Mapping, Iterable]): The search result, or the
+                query and ranking pairs of iter_search_documents
             file_path (str): The file path
         """
         self.logger.info("Writing search result")
+        if isinstance(search_result, Mapping):
+            search_result = search_result.items()
         with open(file_path, "w", encoding="utf_8") as file:
-            file.write("Query;Ranking\n")
-            for query, results in search_result.items():
-                file.write(f"{query};{results}\n")
+            file.write(";".join(SEARCH_RESULT_COLUMNS) + "\n")
+            for query, ranking in search_result:
+                file.writelines(
+                    f"{query};{rank};{document};{similarity!r}\n"
+                    for rank, document, similarity in ranking
+                )
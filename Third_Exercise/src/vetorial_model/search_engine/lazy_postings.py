@@ -0,0 +1,50 @@
+from collections.abc import Mapping
+from typing import Dict, Iterator
+from vetorial_model.processor.reader.binary_index_reader import BinaryIndexReader
+from vetorial_model.search_engine.term_postings import TermPostings
+from vetorial_model.utils.shared import calculate_tf_idf
+
+
+class LazyPostings(Mapping):
+    """Initialize the LazyPostings
+
+    A read only term -> tfidf postings mapping over a binary index. The
+    postings of a term are decoded the first time the term is looked up and
+    kept for the next lookups.
+
+    Args:
+        reader (BinaryIndexReader): The reader of the binary index.
+    """
+
+    def __init__(self, reader: BinaryIndexReader):
+        self.reader = reader
+        self.document_indexes = {
+            document: index for index, document in enumerate(reader.document_ids)
+        }
+        self.loaded_postings: Dict[str, TermPostings] = {}
+
+    def __getitem__(self, term: str) -> TermPostings:
+        if term in self.loaded_postings:
+            return self.loaded_postings[term]
+        if term not in self.reader.terms:
+            raise KeyError(term)
+
+        documents, frequencies = self.reader.read_postings_ids(term)
+        postings = TermPostings(
+            (self.document_indexes[document] for document in documents),
+            (
+                calculate_tf_idf(self.reader.number_of_documents, len(documents), frequency)
+                for frequency in frequencies
+            ),
+        )
+        self.loaded_postings[term] = postings
+        return postings
+
+    def __contains__(self, term: object) -> bool:
+        return term in self.reader.terms
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.reader.terms)
+
+    def __len__(self) -> int:
+        return len(self.reader.terms)
@@ -0,0 +1,307 @@
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from vetorial_model.search_engine.term_postings import TermPostings
+
+# Relative slack added to the upper bounds, so the rounding of the scores can
+# never make the evaluator prune a document of the exact top k
+UPPER_BOUND_SLACK = 1e-9
+# The postings of this many terms are kept as lists, which are faster to
+# search than the arrays, by a least recently used cache
+TERM_POSTINGS_CACHE_SIZE = 256
+
+
+class MaxScoreEvaluator:
+    """Initialize the MaxScoreEvaluator
+
+    Selects the top k documents of a query with the term at a time MaxScore
+    dynamic pruning. Every term has an upper bound of the score it adds to a
+    document. The postings of the terms are accumulated from the highest bound
+    down until the bounds of the remaining terms add up to less than the k-th
+    best partial score. From then on no new document can enter the top k, so
+    the remaining terms, usually the long postings of the common terms, are
+    only looked up for the candidates left, and the candidates whose bound
+    falls under the k-th best partial score are dropped.
+
+    The scores of the candidates left are summed in the order of the query
+    tokens, as in SearchEngine.calculate_similarities, and ties keep the order
+    of the documents list, so the result is the same as the exhaustive
+    evaluation.
+
+    Args:
+        postings (Mapping[str, TermPostings]): The (document index, tfidf) pairs of
+            each term, sorted by document index.
+        document_norms (List[float]): The norm of each document.
+        upper_bounds (Mapping[str, float]): The highest tfidf / norm of each term.
+            The bounds of the missing terms are calculated from their postings.
+    """
+
+    def __init__(
+        self,
+        postings: Mapping[str, TermPostings],
+        document_norms: List[float],
+        upper_bounds: Mapping[str, float],
+    ):
+        self.postings = postings
+        self.document_norms = document_norms
+        self.upper_bounds = dict(upper_bounds)
+        self.inverse_norms = [1 / norm if norm != 0 else 0.0 for norm in document_norms]
+        self.get_term_postings = lru_cache(maxsize=TERM_POSTINGS_CACHE_SIZE)(
+            self.__read_term_postings
+        )
+
+    def __read_term_postings(self, term: str) -> Tuple[List[int], List[float]]:
+        """Read the documents and the values of the postings of a term as lists
+
+        Args:
+            term (str): The term
+
+        Returns:
+            Tuple[List[int], List[float]]: The document indexes and the tfidf values
+        """
+        postings = self.postings[term]
+        return postings.documents.tolist(), postings.values.tolist()
+
+    def __look_up(self, term: str, candidates: List[int]) -> List[Optional[float]]:
+        """Look the candidates up in the postings of a term
+
+        Each binary search starts where the one of the previous candidate stopped.
+
+        Args:
+            term (str): The term
+            candidates (List[int]): The document indexes, sorted
+
+        Returns:
+            List[Optional[float]]: The tfidf of each candidate, None when the
+                term is not on the document
+        """
+        documents, values = self.get_term_postings(term)
+        found_values: List[Optional[float]] = []
+        lookup = 0
+        for index in candidates:
+            lookup = bisect_left(documents, index, lookup)
+            if lookup == len(documents):
+                break
+            found_values.append(values[lookup] if documents[lookup] == index else None)
+        found_values.extend([None] * (len(candidates) - len(found_values)))
+        return found_values
+
+    def __get_upper_bound(self, term: str) -> float:
+        """Get the highest tfidf / norm of a term
+
+        Args:
+            term (str): The term
+
+        Returns:
+            float: The upper bound
+        """
+        if term not in self.upper_bounds:
+            self.upper_bounds[term] = max(
+                (
+                    value / self.document_norms[index]
+                    for index, value in self.postings[term]
+                    if self.document_norms[index] != 0
+                ),
+                default=0.0,
+            )
+        return self.upper_bounds[term]
+
+    def __calculate_threshold(
+        self, lower_bounds: Iterable[float], top_k: int
+    ) -> float:
+        """Get the k-th best lower bound of the candidate scores
+
+        Args:
+            lower_bounds (Iterable[float]): The partial score of each candidate
+            top_k (int): How many documents are selected
+
+        Returns:
+            float: The threshold, 0 while there are less than k candidates
+        """
+        best_lower_bounds = heapq.nlargest(top_k, lower_bounds)
+        if len(best_lower_bounds) < top_k:
+            return 0.0
+        return best_lower_bounds[-1] * (1 - UPPER_BOUND_SLACK)
+
+    def __accumulate_postings(
+        self,
+        terms: List[str],
+        multiplicities: Dict[str, int],
+        bounds: Dict[str, float],
+        accumulator: List[float],
+        top_k: int,
+    ) -> Tuple[int, float, int]:
+        """Accumulate whole postings while a new document can still enter the top k
+
+        Args:
+            terms (List[str]): The query terms, highest bound first
+            multiplicities (Dict[str, int]): How many times each term is in the query
+            bounds (Dict[str, float]): The upper bound of each term
+            accumulator (List[float]): The partial score of each document, updated
+            top_k (int): How many documents are selected
+
+        Returns:
+            Tuple[int, float, int]: How many terms were accumulated, the threshold
+                and the number of postings evaluated
+        """
+        inverse_norms = self.inverse_norms
+        threshold = 0.0
+        evaluated = 0
+        for position, term in enumerate(terms, 1):
+            documents, values = self.get_term_postings(term)
+            multiplicity = multiplicities[term]
+            for index, value in zip(documents, values):
+                accumulator[index] += multiplicity * value
+            evaluated += len(documents)
+
+            # The k-th best partial score of the documents of the term is never
+            # higher than the one of every document
+            threshold = max(
+                threshold,
+                self.__calculate_threshold(
+                    [accumulator[index] * inverse_norms[index] for index in documents],
+                    top_k,
+                ),
+            )
+            if sum(bounds[term] for term in terms[position:]) < threshold:
+                return position, threshold, evaluated
+        return len(terms), threshold, evaluated
+
+    def __drop_candidates(
+        self,
+        candidates: List[int],
+        accumulator: List[float],
+        remaining_bound: float,
+        threshold: float,
+    ) -> List[int]:
+        """Keep the candidates that can still reach the threshold
+
+        Args:
+            candidates (List[int]): The document indexes
+            accumulator (List[float]): The partial score of each document
+            remaining_bound (float): The sum of the bounds of the terms not looked up
+            threshold (float): The k-th best partial score
+
+        Returns:
+            List[int]: The candidates left
+        """
+        inverse_norms = self.inverse_norms
+        return [
+            index
+            for index in candidates
+            if accumulator[index] * inverse_norms[index] * (1 + UPPER_BOUND_SLACK)
+            + remaining_bound
+            >= threshold
+        ]
+
+    def __look_up_remaining_terms(
+        self,
+        terms: List[str],
+        multiplicities: Dict[str, int],
+        bounds: Dict[str, float],
+        accumulator: List[float],
+        threshold: float,
+        top_k: int,
+    ) -> Tuple[List[int], int]:
+        """Look the remaining terms up for the candidates that can still beat
+        the threshold only
+
+        Args:
+            terms (List[str]): The terms not accumulated, highest bound first
+            multiplicities (Dict[str, int]): How many times each term is in the query
+            bounds (Dict[str, float]): The upper bound of each term
+            accumulator (List[float]): The partial score of each document, updated
+            threshold (float): The k-th best partial score
+            top_k (int): How many documents are selected
+
+        Returns:
+            Tuple[List[int], int]: The candidates left and the number of postings
+                evaluated
+        """
+        inverse_norms = self.inverse_norms
+        candidates = [index for index, value in enumerate(accumulator) if value != 0]
+        candidates = self.__drop_candidates(
+            candidates, accumulator, sum(bounds[term] for term in terms), threshold
+        )
+        evaluated = 0
+        for position, term in enumerate(terms, 1):
+            multiplicity = multiplicities[term]
+            found_values = self.__look_up(term, candidates)
+            for index, value in zip(candidates, found_values):
+                if value is not None:
+                    accumulator[index] += multiplicity * value
+            evaluated += len(candidates)
+
+            threshold = self.__calculate_threshold(
+                [accumulator[index] * inverse_norms[index] for index in candidates],
+                top_k,
+            )
+            candidates = self.__drop_candidates(
+                candidates,
+                accumulator,
+                sum(bounds[term] for term in terms[position:]),
+                threshold,
+            )
+        return candidates, evaluated
+
+    def __score_candidates(
+        self, tokens: List[str], terms: Iterable[str], candidates: List[int]
+    ) -> List[Tuple[int, float]]:
+        """Score the candidates exactly, in the order of the query tokens
+
+        Args:
+            tokens (List[str]): The query tokens
+            terms (Iterable[str]): The query terms with postings
+            candidates (List[int]): The document indexes
+
+        Returns:
+            List[Tuple[int, float]]: The (document index, similarity) of the
+                candidates with a non zero similarity
+        """
+        candidate_values = {term: self.__look_up(term, candidates) for term in terms}
+        scores = []
+        for candidate, index in enumerate(candidates):
+            similarity: float = 0
+            for token in tokens:
+                if token in candidate_values:
+                    value = candidate_values[token][candidate]
+                    if value is not None:
+                        similarity += value
+            similarity = similarity / self.document_norms[index]
+            if similarity != 0:
+                scores.append((index, similarity))
+        return scores
+
+    def evaluate(
+        self, tokens: List[str], top_k: int
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """Select the top k documents of the query tokens
+
+        Args:
+            tokens (List[str]): The query tokens
+            top_k (int): How many documents are selected
+
+        Returns:
+            Tuple[List[Tuple[int, float]], int]: The (document index, similarity) of
+                the best documents with a non zero similarity, best first, and the
+                number of postings evaluated
+        """
+        multiplicities = Counter(token for token in tokens if token in self.postings)
+        bounds = {
+            term: multiplicity * self.__get_upper_bound(term) * (1 + UPPER_BOUND_SLACK)
+            for term, multiplicity in multiplicities.items()
+        }
+        terms = sorted(bounds, key=lambda term: bounds[term], reverse=True)
+
+        accumulator = [0.0] * len(self.document_norms)
+        position, threshold, evaluated = self.__accumulate_postings(
+            terms, multiplicities, bounds, accumulator, top_k
+        )
+        candidates, looked_up = self.__look_up_remaining_terms(
+            terms[position:], multiplicities, bounds, accumulator, threshold, top_k
+        )
+        scores = self.__score_candidates(tokens, bounds, candidates)
+        evaluated += looked_up + len(candidates) * len(bounds)
+        return heapq.nlargest(top_k, scores, key=lambda x: x[1]), evaluated
@@ -0,0 +1,112 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+from vetorial_model.search_engine.engine import SearchEngine
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+
+
+class SearchServer(ThreadingHTTPServer):
+    """Initialize the SearchServer
+
+    Answers queries over HTTP with a search engine whose model stays loaded
+    in memory. Every request is handled on its own thread.
+
+    GET /search?q=<query text>&k=<number of documents> returns the top k
+    documents of the query and the time the search took as json.
+
+    Args:
+        address (Tuple[str, int]): The host and the port to listen on.
+        search_engine (SearchEngine): The search engine with the model read.
+        top_k (int): The number of documents returned when the request does
+            not set k. Default: 10
+        pruning (bool): If the top k should be selected with the MaxScore
+            dynamic pruning. Default: False
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        search_engine: SearchEngine,
+        top_k: int = 10,
+        pruning: bool = False,
+    ):
+        super().__init__(address, SearchRequestHandler)
+        self.logger = get_logger_with_date_output("SearchServer")
+        self.search_engine = search_engine
+        self.top_k = top_k
+        self.pruning = pruning
+
+    def search(self, query: str, top_k: int) -> Dict[str, Any]:
+        """Search a query and time it
+
+        Args:
+            query (str): The query text
+            top_k (int): The number of documents returned
+
+        Returns:
+            Dict[str, Any]: The query, the latency in milliseconds and the results
+        """
+        start_time = time.perf_counter()
+        ranking = self.search_engine.search_query(query, top_k, self.pruning)
+        latency = (time.perf_counter() - start_time) * 1000
+        self.logger.info(f"Query {query!r} took {latency:.2f} ms")
+        return {
+            "query": query,
+            "top_k": top_k,
+            "latency_ms": round(latency, 3),
+            "results": [
+                {"rank": rank, "document": document, "score": score}
+                for rank, document, score in ranking
+            ],
+        }
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """Handle the requests of the SearchServer"""
+
+    server: SearchServer
+
+    def do_GET(self):
+        """Answer a search request"""
+        url = urlparse(self.path)
+        if url.path != "/search":
+            self.__send_json(404, {"error": f"Unknown path {url.path}"})
+            return
+
+        parameters = parse_qs(url.query)
+        query = parameters.get("q", [""])[0]
+        if not query.strip():
+            self.__send_json(400, {"error": "The query parameter q is empty"})
+            return
+
+        try:
+            top_k = int(parameters.get("k", [self.server.top_k])[0])
+        except ValueError:
+            top_k = 0
+        if top_k < 1:
+            self.__send_json(400, {"error": "k must be a positive integer"})
+            return
+
+        self.__send_json(200, self.server.search(query, top_k))
+
+    def __send_json(self, status: int, body: Dict[str, Any]):
+        """Send a json response
+
+        Args:
+            status (int): The HTTP status
+            body (Dict[str, Any]): The response body
+        """
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any):
+        """Log the requests with the server logger instead of stderr"""
+        self.server.logger.debug(f"{self.address_string()} {format % args}")
@@ -0,0 +1,60 @@
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, Iterator, Tuple, Union
+from vetorial_model.utils.id_table import ID_TYPECODE
+
+
+class TermPostings(Sequence):
+    """Initialize the TermPostings
+
+    The (document index, tfidf) pairs of a term, sorted by document index,
+    stored as an int32 array of document indexes and a float64 array of
+    values: 12 bytes a posting instead of a tuple with two objects.
+
+    Args:
+        documents (Iterable[int]): The document indexes. Default: ()
+        values (Iterable[float]): The tfidf on each document. Default: ()
+    """
+
+    __slots__ = ("documents", "values")
+
+    def __init__(self, documents: Iterable[int] = (), values: Iterable[float] = ()):
+        self.documents = array(ID_TYPECODE, documents)
+        self.values = array("d", values)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, float]]) -> "TermPostings":
+        """Create the postings from (document index, tfidf) pairs
+
+        Args:
+            pairs (Iterable[Tuple[int, float]]): The pairs, sorted by document index
+
+        Returns:
+            TermPostings: The postings
+        """
+        postings = cls()
+        for document, value in pairs:
+            postings.documents.append(document)
+            postings.values.append(value)
+        return postings
+
+    def __getitem__(
+        self, position: Union[int, slice]
+    ) -> Union[Tuple[int, float], "TermPostings"]:
+        if isinstance(position, slice):
+            return TermPostings(self.documents[position], self.values[position])
+        return self.documents[position], self.values[position]
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        return zip(self.documents, self.values)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TermPostings):
+            return self.documents == other.documents and self.values == other.values
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TermPostings({list(self)!r})"
@@ -0,0 +1,343 @@
+"""Porter Stemming Algorithm, tuned for speed
+
+Same algorithm, and the same output, as vetorial_model.stemmer.porter, with
+its --DEPARTURE-- points. The word is translated once into its form, a string
+with "c" for every consonant and "v" for every vowel, which is only rebuilt
+when a suffix is replaced. m() is then the number of "vc" in the form,
+vowelinstem() a "v" lookup and cons() a character test, all done by str
+methods instead of per letter Python loops. The word buffer, its form and
+the end offset k are passed from step to step.
+"""
+
+from typing import Dict, Tuple
+
+FORM_TABLE = str.maketrans(
+    {
+        **{chr(code): "c" for code in range(128)},
+        **{letter: "v" for letter in "aeiou"},
+        "y": "y",
+    }
+)
+
+# Suffix rules of each step, keyed by the letter that selects the rule group,
+# in the order the original elif chains test them
+STEP2_RULES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "a": (("ational", "ate"), ("tional", "tion")),
+    "c": (("enci", "ence"), ("anci", "ance")),
+    "e": (("izer", "ize"),),
+    "l": (("bli", "ble"), ("alli", "al"), ("entli", "ent"), ("eli", "e"), ("ousli", "ous")),
+    "o": (("ization", "ize"), ("ation", "ate"), ("ator", "ate")),
+    "s": (("alism", "al"), ("iveness", "ive"), ("fulness", "ful"), ("ousness", "ous")),
+    "t": (("aliti", "al"), ("iviti", "ive"), ("biliti", "ble")),
+    "g": (("logi", "log"),),
+}
+STEP3_RULES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "e": (("icate", "ic"), ("ative", ""), ("alize", "al")),
+    "i": (("iciti", "ic"),),
+    "l": (("ical", "ic"), ("ful", "")),
+    "s": (("ness", ""),),
+}
+STEP4_RULES: Dict[str, Tuple[str, ...]] = {
+    "a": ("al",),
+    "c": ("ance", "ence"),
+    "e": ("er",),
+    "i": ("ic",),
+    "l": ("able", "ible"),
+    "n": ("ant", "ement", "ment", "ent"),
+    "o": ("ion", "ou"),
+    "s": ("ism",),
+    "t": ("ate", "iti"),
+    "u": ("ous",),
+    "v": ("ive",),
+    "z": ("ize",),
+}
+
+# Every suffix of each rule group, to reject the words that match none of
+# them with a single str.endswith call
+STEP2_SUFFIXES = {
+    letter: tuple(suffix for suffix, _ in rules) for letter, rules in STEP2_RULES.items()
+}
+STEP3_SUFFIXES = {
+    letter: tuple(suffix for suffix, _ in rules) for letter, rules in STEP3_RULES.items()
+}
+
+
+def word_form(word: str) -> str:
+    """Get the form of the word, with "c" for consonants and "v" for vowels
+
+    A "y" is a consonant at the start of the word or after a vowel.
+
+    Args:
+        word (str): The word buffer
+
+    Returns:
+        str: The form of the word
+    """
+    form = word.translate(FORM_TABLE)
+    if not form.isascii():
+        form = "".join(letter if letter in "vy" else "c" for letter in form)
+    if "y" not in form:
+        return form
+
+    letters = list(form)
+    for index, letter in enumerate(letters):
+        if letter == "y":
+            letters[index] = "c" if index == 0 or letters[index - 1] == "v" else "v"
+    return "".join(letters)
+
+
+def replace_suffix(b: str, j: int, replacement: str) -> Tuple[str, str, int]:
+    """Write the replacement after the offset j, as setto() does
+
+    Args:
+        b (str): The word buffer
+        j (int): The offset before the suffix
+        replacement (str): The new suffix
+
+    Returns:
+        Tuple[str, str, int]: The word buffer, its form and the new end offset k
+    """
+    b = b[: j + 1] + replacement + b[j + len(replacement) + 1 :]
+    return b, word_form(b), j + len(replacement)
+
+
+def step1a(b: str, form: str, k: int) -> Tuple[str, str, int]:
+    """Remove the plurals: sses -> ss, ies -> i, s ->
+
+    Args:
+        b (str): The word buffer
+        form (str): The form of the word buffer
+        k (int): The end offset of the word
+
+    Returns:
+        Tuple[str, str, int]: The word buffer, its form and the end offset
+    """
+    if b[k] != "s":
+        return b, form, k
+    if b.endswith("sses", 0, k + 1):
+        return b, form, k - 2
+    if b.endswith("ies", 0, k + 1):
+        return replace_suffix(b, k - 3, "i")
+    if b[k - 1] != "s":
+        return b, form, k - 1
+    return b, form, k
+
+
+def step1b_tidy(b: str, form: str, k: int, j: int) -> Tuple[str, str, int]:
+    """Tidy the stem left by removing -ed or -ing: at -> ate, bl -> ble,
+    iz -> ize, drop a double consonant or add an e to a short stem
+
+    Args:
+        b (str): The word buffer
+        form (str): The form of the word buffer
+        k (int): The end offset of the stem
+        j (int): The offset before the -ed or -ing
+
+    Returns:
+        Tuple[str, str, int]: The word buffer, its form and the end offset
+    """
+    for suffix, replacement in (("at", "ate"), ("bl", "ble"), ("iz", "ize")):
+        if b.endswith(suffix, 0, k + 1):
+            return replace_suffix(b, k - 2, replacement)
+    if k >= 1 and b[k] == b[k - 1] and form[k] == "c":
+        if b[k - 1] not in "lsz":
+            k -= 1
+        return b, form, k
+    if (
+        k >= 2
+        and form.endswith("cvc", 0, k + 1)
+        and b[k] not in "wxy"
+        and form.count("vc", 0, j + 1) == 1
+    ):
+        return replace_suffix(b, j, "e")
+    return b, form, k
+
+
+def step1b(b: str, form: str, k: int) -> Tuple[str, str, int]:
+    """Remove -eed, -ed and -ing
+
+    Args:
+        b (str): The word buffer
+        form (str): The form of the word buffer
+        k (int): The end offset of the word
+
+    Returns:
+        Tuple[str, str, int]: The word buffer, its form and the end offset
+    """
+    last_letter = b[k]
+    if last_letter == "d" and b.endswith("eed", 0, k + 1):
+        if form.count("vc", 0, k - 2) > 0:
+            k -= 1
+        return b, form, k
+    if (last_letter == "d" and b[k - 1] == "e") or (
+        last_letter == "g" and b.endswith("ing", 0, k + 1)
+    ):
+        j = k - 2 if last_letter == "d" else k - 3
+        if form.find("v", 0, j + 1) >= 0:
+            return step1b_tidy(b, form, j, j)
+    return b, form, k
+
+
+def step1c(b: str, form: str, k: int) -> Tuple[str, str, int]:
+    """Turn a terminal y to i when there is another vowel in the stem
+
+    Args:
+        b (str): The word buffer
+        form (str): The form of the word buffer
+        k (int): The end offset of the word
+
+    Returns:
+        Tuple[str, str, int]: The word buffer, its form and the end offset
+    """
+    if b[k] == "y" and form.find("v", 0, k) >= 0:
+        b = b[:k] + "i" + b[k + 1 :]
+        form = word_form(b)
+    return b, form, k
+
+
+def replace_rule_suffix(
+    b: str,
+    form: str,
+    k: int,
+    letter: str,
+    suffixes: Dict[str, Tuple[str, ...]],
+    rules: Dict[str, Tuple[Tuple[str, str], ...]],
+) -> Tuple[str, str, int]:
+    """Replace the first suffix of the rule group of a letter, when m() > 0
+
+    Args:
+        b (str): The word buffer
+        form (str): The form of the word buffer
+        k (int): The end offset of the word
+        letter (str): The letter that selects the rule group
+        suffixes (Dict[str, Tuple[str, ...]]): Every suffix of each rule group
+        rules (Dict[str, Tuple[Tuple[str, str], ...]]): The rules of each group
+
+    Returns:
+        Tuple[str, str, int]: The word buffer, its form and the end offset
+    """
+    if letter not in suffixes or not b.endswith(suffixes[letter], 0, k + 1):
+        return b, form, k
+    for suffix, replacement in rules[letter]:
+        if b.endswith(suffix, 0, k + 1):
+            j = k - len(suffix)
+            if form.count("vc", 0, j + 1) > 0:
+                return replace_suffix(b, j, replacement)
+            break
+    return b, form, k
+
+
+def step2(b: str, form: str, k: int) -> Tuple[str, str, int]:
+    """Map the double suffixes to single ones, -ization -> -ize and so on
+
+    Args:
+        b (str): The word buffer
+        form (str): The form of the word buffer
+        k (int): The end offset of the word
+
+    Returns:
+        Tuple[str, str, int]: The word buffer, its form and the end offset
+    """
+    return replace_rule_suffix(b, form, k, b[k - 1], STEP2_SUFFIXES, STEP2_RULES)
+
+
+def step3(b: str, form: str, k: int) -> Tuple[str, str, int]:
+    """Handle -ic-, -full, -ness and the like
+
+    Args:
+        b (str): The word buffer
+        form (str): The form of the word buffer
+        k (int): The end offset of the word
+
+    Returns:
+        Tuple[str, str, int]: The word buffer, its form and the end offset
+    """
+    return replace_rule_suffix(b, form, k, b[k], STEP3_SUFFIXES, STEP3_RULES)
+
+
+def step4(b: str, form: str, k: int) -> Tuple[str, str, int]:
+    """Remove -ant, -ence and the like when m() > 1
+
+    Args:
+        b (str): The word buffer
+        form (str): The form of the word buffer
+        k (int): The end offset of the word
+
+    Returns:
+        Tuple[str, str, int]: The word buffer, its form and the end offset
+    """
+    letter = b[k - 1]
+    if letter not in STEP4_RULES or not b.endswith(STEP4_RULES[letter], 0, k + 1):
+        return b, form, k
+    for suffix in STEP4_RULES[letter]:
+        if b.endswith(suffix, 0, k + 1):
+            j = k - len(suffix)
+            if suffix == "ion" and (j < 0 or b[j] not in "st"):
+                continue
+            if form.count("vc", 0, j + 1) > 1:
+                k = j
+            break
+    return b, form, k
+
+
+def step5(b: str, form: str, k: int) -> int:
+    """Remove a final -e when m() > 1, and change -ll to -l when m() > 1
+
+    Args:
+        b (str): The word buffer
+        form (str): The form of the word buffer
+        k (int): The end offset of the word
+
+    Returns:
+        int: The end offset
+    """
+    measure = form.count("vc", 0, k + 1)
+    if b[k] == "e" and (
+        measure > 1
+        or (
+            measure == 1
+            and not (
+                k >= 3 and form.endswith("cvc", 0, k) and b[k - 1] not in "wxy"
+            )
+        )
+    ):
+        k -= 1
+    if b[k] == "l" and k >= 1 and b[k - 1] == "l" and measure > 1:
+        k -= 1
+    return k
+
+
+def stem_word(word: str) -> str:
+    """Stem a lower case word
+
+    Args:
+        word (str): The word
+
+    Returns:
+        str: The stemmed word
+    """
+    k = len(word) - 1
+    if k <= 1:
+        return word  # --DEPARTURE--
+
+    b, form = word, word_form(word)
+    # Most words match no rule of a step, so the suffixes that select the rules
+    # are tested before paying for the call
+    if b[k] == "s":
+        b, form, k = step1a(b, form, k)
+    if b[k] in "dg":
+        b, form, k = step1b(b, form, k)
+    if b[k] == "y":
+        b, form, k = step1c(b, form, k)
+    letter = b[k - 1]
+    if letter in STEP2_SUFFIXES and b.endswith(STEP2_SUFFIXES[letter], 0, k + 1):
+        b, form, k = step2(b, form, k)
+    letter = b[k]
+    if letter in STEP3_SUFFIXES and b.endswith(STEP3_SUFFIXES[letter], 0, k + 1):
+        b, form, k = step3(b, form, k)
+    letter = b[k - 1]
+    if letter in STEP4_RULES and b.endswith(STEP4_RULES[letter], 0, k + 1):
+        b, form, k = step4(b, form, k)
+    if b[k] in "el":
+        k = step5(b, form, k)
+    return b[: k + 1]
@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import Optional
+from vetorial_model.stemmer.fast_porter import stem_word
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+
+
+class StemmerService:
+    """Initialize the StemmerService
+
+    Stems words with the fast Porter stemmer behind a memoizing cache.
+
+    Args:
+        max_size (Optional[int]): The number of words kept by the LRU cache.
+            Default: None, which keeps the whole vocabulary
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.logger = get_logger_with_date_output("StemmerService")
+        self.stem = lru_cache(maxsize=max_size)(stem_word)
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the rate of words stemmed from the cache
+
+        Returns:
+            float: The hit rate, from 0 to 1
+        """
+        cache_info = self.stem.cache_info()
+        total = cache_info.hits + cache_info.misses
+        return cache_info.hits / total if total > 0 else 0
+
+    def report(self):
+        """Log the cache statistics"""
+        cache_info = self.stem.cache_info()
+        self.logger.info(
+            f"Stemmed {cache_info.hits + cache_info.misses} words, "
+            f"{cache_info.currsize} cached, hit rate {self.hit_rate:.2%}"
+        )
+
+
+_stemmer_service: Optional[StemmerService] = None
+
+
+def get_stemmer_service() -> StemmerService:
+    """Get the stemmer service shared by every stage of the process
+
+    Returns:
+        StemmerService: The stemmer service
+    """
+    global _stemmer_service
+    if _stemmer_service is None:
+        _stemmer_service = StemmerService()
+    return _stemmer_service
@@ -0,0 +1,92 @@
+import struct
+from typing import List, Tuple
+
+BINARY_INDEX_MAGIC = b"VMIDX"
+# Version 2 stores the score upper bound of each term in the term dictionary
+BINARY_INDEX_VERSION = 2
+
+# magic, version, number of documents, documents count, terms count,
+# document id width, postings count, tokens count, dictionary offset,
+# postings offset
+BINARY_INDEX_HEADER = struct.Struct("<5sBIIIIQQQQ")
+
+# The highest tfidf / norm of a term over its documents
+UPPER_BOUND = struct.Struct("<d")
+
+
+def encode_varint(value: int, buffer: bytearray):
+    """Append an unsigned integer to the buffer as a LEB128 varint
+
+    Args:
+        value (int): The value to be encoded
+        buffer (bytearray): The buffer
+    """
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def decode_varint(buffer: bytes, position: int) -> Tuple[int, int]:
+    """Decode a LEB128 varint from the buffer
+
+    Args:
+        buffer (bytes): The buffer
+        position (int): The position of the varint
+
+    Returns:
+        Tuple[int, int]: The value and the position right after it
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def encode_postings(documents: List[int], frequencies: List[int]) -> bytes:
+    """Encode the postings of a term as delta encoded varints
+
+    Args:
+        documents (List[int]): The sorted document ids
+        frequencies (List[int]): The frequency of the term on each document
+
+    Returns:
+        bytes: The encoded postings
+    """
+    buffer = bytearray()
+    last_document = 0
+    for document, frequency in zip(documents, frequencies):
+        encode_varint(document - last_document, buffer)
+        encode_varint(frequency, buffer)
+        last_document = document
+    return bytes(buffer)
+
+
+def decode_postings(
+    buffer: bytes, position: int, count: int
+) -> Tuple[List[int], List[int]]:
+    """Decode the delta encoded postings of a term
+
+    Args:
+        buffer (bytes): The buffer
+        position (int): The position of the postings
+        count (int): The number of postings
+
+    Returns:
+        Tuple[List[int], List[int]]: The document ids and the frequencies
+    """
+    documents = []
+    frequencies = []
+    document = 0
+    for _ in range(count):
+        delta, position = decode_varint(buffer, position)
+        frequency, position = decode_varint(buffer, position)
+        document += delta
+        documents.append(document)
+        frequencies.append(frequency)
+    return documents, frequencies
@@ -0,0 +1,74 @@
+from array import array
+from typing import Dict, Iterable, List
+
+# The ids are stored as C ints, 32 bits wide on every supported platform
+ID_TYPECODE = "i"
+MAX_ID = 2**31 - 1
+
+
+class IdTable:
+    """Initialize the IdTable
+
+    Maps external keys, the terms of the lexicon or the ids of the documents,
+    to dense int32 ids given in the order the keys are added. Everything
+    inside works with the ids and the keys are only looked up again to write
+    the output.
+
+    Args:
+        keys (Iterable[str]): The first keys. Default: ()
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self.ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: str) -> int:
+        """Get the id of a key, adding the key when it is new
+
+        Args:
+            key (str): The key
+
+        Returns:
+            int: The id
+        """
+        key_id = self.ids.get(key)
+        if key_id is None:
+            key_id = len(self.keys)
+            if key_id > MAX_ID:
+                raise OverflowError(f"More than {MAX_ID + 1} keys")
+            self.ids[key] = key_id
+            self.keys.append(key)
+        return key_id
+
+    def to_ids(self, keys: Iterable[str]) -> array:
+        """Get the ids of known keys
+
+        Args:
+            keys (Iterable[str]): The keys
+
+        Returns:
+            array: The int32 id of each key
+        """
+        return array(ID_TYPECODE, map(self.ids.__getitem__, keys))
+
+    def to_keys(self, ids: Iterable[int]) -> List[str]:
+        """Get the keys of ids
+
+        Args:
+            ids (Iterable[int]): The ids
+
+        Returns:
+            List[str]: The key of each id
+        """
+        return [self.keys[key_id] for key_id in ids]
+
+    def __getitem__(self, key: str) -> int:
+        return self.ids[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.ids
+
+    def __len__(self) -> int:
+        return len(self.keys)
@@ -1,19 +1,129 @@
 import re
 import unicodedata
-import nltk
+from typing import Iterable, List, Optional
+from vetorial_model.utils.logger_utils import get_logger_with_date_output
+from vetorial_model.utils.resource_utils import (
+    get_english_stopwords,
+    has_nltk_tokenizer,
+)
+
+# Every character the normalization turns into a space, and upper case letters
+# lowered, so the text is cleaned by a single str.translate call
+SEPARATORS = ";\"'(){}[].+><=,!?:-/"
+WHITESPACES = " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+NORMALIZE_TABLE = str.maketrans(
+    {
+        **{character: " " for character in SEPARATORS + WHITESPACES},
+        **{chr(code): chr(code).lower() for code in range(ord("A"), ord("Z") + 1)},
+    }
+)
+# Words with 3 or more letters, delimited by spaces
+TOKEN_PATTERN = re.compile(r"(?<![^ ])[a-z]{3,}(?![^ ])")
+# The words nltk.word_tokenize splits in two on a normalized text, which only
+# has lower case letters and single spaces
+CONTRACTIONS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
+
+
+class Tokenizer:
+    """Initialize the Tokenizer
+
+    Splits normalized texts into tokens and removes the stopwords. The
+    stopwords are loaded once and shared by every text.
+
+    Args:
+        stopwords (Optional[Iterable[str]]): The stopwords.
+            Default: None, which uses the vendored english stopwords of nltk
+        use_nltk (bool): If the text should be split by nltk.word_tokenize
+            instead of on its spaces, which gives the same tokens on a
+            normalized text. Falls back to the spaces when the punkt model is
+            not installed. Default: False
+    """
+
+    def __init__(
+        self, stopwords: Optional[Iterable[str]] = None, use_nltk: bool = False
+    ):
+        self.logger = get_logger_with_date_output("Tokenizer")
+        self.stopwords = (
+            frozenset(stopwords) if stopwords is not None else get_english_stopwords()
+        )
+        self.word_tokenize = None
+        if use_nltk and has_nltk_tokenizer():
+            from nltk import word_tokenize
+
+            self.word_tokenize = word_tokenize
+        elif use_nltk:
+            self.logger.warning(
+                "The nltk punkt model is not installed. Splitting on spaces instead."
+            )
+
+    @staticmethod
+    def __split(text: str) -> List[str]:
+        """Split a normalized text on its spaces, like nltk.word_tokenize
+
+        Args:
+            text (str): The normalized text
+
+        Returns:
+            List[str]: The words
+        """
+        words = text.split()
+        if CONTRACTIONS.keys().isdisjoint(words):
+            return words
+        split_words = []
+        for word in words:
+            split_words.extend(CONTRACTIONS.get(word, (word,)))
+        return split_words
+
+    def tokenize(self, text: str) -> List[str]:
+        """Tokenize a normalized text
+
+        Args:
+            text (str): The normalized text
+
+        Returns:
+            List[str]: The tokens that are not stopwords
+        """
+        if self.word_tokenize is not None:
+            words = self.word_tokenize(text)
+        else:
+            words = self.__split(text)
+        stopwords = self.stopwords
+        return [word.lower() for word in words if word not in stopwords]
+
+
+_tokenizer: Optional[Tokenizer] = None
+
+
+def get_tokenizer() -> Tokenizer:
+    """Get the tokenizer shared by every stage of the process
 
-nltk.download("stopwords")
-nltk.download("punkt")
+    Returns:
+        Tokenizer: The tokenizer
+    """
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = Tokenizer()
+    return _tokenizer
 
 
 class Normalize:
-    def __init__(self, text: str):
+    def __init__(self, text: str, tokenizer: Optional[Tokenizer] = None):
         """Initialize the Normalize class
 
         Args:
             text (str): Text to normalize
+            tokenizer (Optional[Tokenizer]): The tokenizer of the normalized text.
+                Default: None, which uses the shared tokenizer
         """
         self.text = text
+        self.tokenizer = tokenizer if tokenizer is not None else get_tokenizer()
         self.normalized_text = self.normalize(text)
         self.normalized_text_size = len(self.normalized_text)
         self.tokenized_text = self.__tokenize()
@@ -157,24 +267,56 @@ class Normalize:
         text = text.replace("]", " ")
         return text
 
-    def normalize(self, text):
+    @staticmethod
+    def normalize(text: str, fast: bool = True) -> str:
         """Normalize text
 
+        Args:
+            text (str): Text to normalize
+            fast (bool): If the text should be normalized in a single pass
+                instead of the chain of replacements. Both give the same text.
+                Default: True
+
+        Returns:
+            str: Normalized text
+        """
+        if fast:
+            return Normalize.__normalize_single_pass(text)
+        return Normalize.__normalize_chain(text)
+
+    @staticmethod
+    def __normalize_single_pass(text: str) -> str:
+        """Normalize text with one translate table and one tokenizing regex
+
+        Args:
+            text (str): Text to normalize
+
+        Returns:
+            str: Normalized text
+        """
+        if not text.isascii():
+            text = Normalize.__remove_accent(text)
+        return " ".join(TOKEN_PATTERN.findall(text.translate(NORMALIZE_TABLE)))
+
+    @staticmethod
+    def __normalize_chain(text: str) -> str:
+        """Normalize text with a chain of replacements
+
         Args:
             text (str): Text to normalize
 
         Returns:
             str: Normalized text
         """
-        text = self.__remove_accent(text)
-        text = self.__remove_semicolon(text)
-        text = self.__treat_text(text)
-        text = self.__remove_quotes(text)
-        text = self.__remove_parenthesis(text)
-        text = self.__remove_keys_brackets(text)
-        text = self.__remove_square_brackets(text)
-        text = self.__remove_punctuation(text)
-        text = self.__replace_multiple_space_by_one_regex(text)
+        text = Normalize.__remove_accent(text)
+        text = Normalize.__remove_semicolon(text)
+        text = Normalize.__treat_text(text)
+        text = Normalize.__remove_quotes(text)
+        text = Normalize.__remove_parenthesis(text)
+        text = Normalize.__remove_keys_brackets(text)
+        text = Normalize.__remove_square_brackets(text)
+        text = Normalize.__remove_punctuation(text)
+        text = Normalize.__replace_multiple_space_by_one_regex(text)
         words = text.split(" ")
         words = [word for word in words if word.isalpha()]
         ## filter for words with 2 or more letters
@@ -196,9 +338,4 @@ class Normalize:
         Returns:
             list: List of tokens
         """
-        stop_words = [word.lower() for word in nltk.corpus.stopwords.words("english")]
-        return [
-            word.lower()
-            for word in nltk.word_tokenize(self.normalized_text)
-            if word not in stop_words
-        ]
+        return self.tokenizer.tokenize(self.normalized_text)
@@ -0,0 +1,72 @@
+"""Resources of the text processing that used to come from nltk_data
+
+Nothing is downloaded: the stopwords are vendored and the nltk data is only
+looked up, once, when a caller asks for it.
+"""
+
+from functools import lru_cache
+from typing import FrozenSet, Tuple
+
+# The english stopwords of the nltk stopwords corpus
+ENGLISH_STOPWORDS: Tuple[str, ...] = (
+    "i", "me", "my", "myself", "we", "our", "ours", "ourselves", "you", "you're",
+    "you've", "you'll", "you'd", "your", "yours", "yourself", "yourselves", "he",
+    "him", "his", "himself", "she", "she's", "her", "hers", "herself", "it", "it's",
+    "its", "itself", "they", "them", "their", "theirs", "themselves", "what",
+    "which", "who", "whom", "this", "that", "that'll", "these", "those", "am", "is",
+    "are", "was", "were", "be", "been", "being", "have", "has", "had", "having",
+    "do", "does", "did", "doing", "a", "an", "the", "and", "but", "if", "or",
+    "because", "as", "until", "while", "of", "at", "by", "for", "with", "about",
+    "against", "between", "into", "through", "during", "before", "after", "above",
+    "below", "to", "from", "up", "down", "in", "out", "on", "off", "over", "under",
+    "again", "further", "then", "once", "here", "there", "when", "where", "why",
+    "how", "all", "any", "both", "each", "few", "more", "most", "other", "some",
+    "such", "no", "nor", "not", "only", "own", "same", "so", "than", "too", "very",
+    "s", "t", "can", "will", "just", "don", "don't", "should", "should've", "now",
+    "d", "ll", "m", "o", "re", "ve", "y", "ain", "aren", "aren't", "couldn",
+    "couldn't", "didn", "didn't", "doesn", "doesn't", "hadn", "hadn't", "hasn",
+    "hasn't", "haven", "haven't", "isn", "isn't", "ma", "mightn", "mightn't",
+    "mustn", "mustn't", "needn", "needn't", "shan", "shan't", "shouldn",
+    "shouldn't", "wasn", "wasn't", "weren", "weren't", "won", "won't", "wouldn",
+    "wouldn't",
+)
+# The punkt models nltk.word_tokenize may load, depending on the nltk version
+PUNKT_RESOURCES = ("tokenizers/punkt_tab/english/", "tokenizers/punkt")
+
+
+@lru_cache(maxsize=None)
+def get_english_stopwords() -> FrozenSet[str]:
+    """Get the english stopwords
+
+    Returns:
+        FrozenSet[str]: The lower case stopwords
+    """
+    return frozenset(ENGLISH_STOPWORDS)
+
+
+@lru_cache(maxsize=None)
+def has_nltk_resource(resource_path: str) -> bool:
+    """Check if a nltk data resource is installed, without downloading it
+
+    Args:
+        resource_path (str): The path of the resource inside nltk_data
+
+    Returns:
+        bool: True if nltk is installed and has the resource
+    """
+    try:
+        import nltk
+
+        nltk.data.find(resource_path)
+    except (ImportError, LookupError):
+        return False
+    return True
+
+
+def has_nltk_tokenizer() -> bool:
+    """Check if nltk.word_tokenize can run offline
+
+    Returns:
+        bool: True if a punkt model is installed
+    """
+    return any(has_nltk_resource(resource) for resource in PUNKT_RESOURCES)
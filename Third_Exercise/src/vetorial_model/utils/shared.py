@@ -1,4 +1,9 @@
 import math
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 def calculate_tf_idf(
@@ -20,3 +25,70 @@ def calculate_tf_idf(
     return (1 + math.log2(document_frequency)) * math.log2(
         number_of_documents / number_of_terms
     )
+
+
+def calculate_tf_idf_array(
+    number_of_documents: int,
+    number_of_terms: "np.ndarray",
+    document_frequency: "np.ndarray",
+) -> "np.ndarray":
+    """Calculate the tfidf of many words at once, with the same values as calculate_tf_idf
+
+    The logarithms are taken with math.log2 over the distinct values only, so
+    the result matches the scalar formula bit by bit.
+
+    Args:
+        number_of_documents (int): The number of documents
+        number_of_terms (np.ndarray): The number of terms of each word
+        document_frequency (np.ndarray): The document frequency of each word
+
+    Returns:
+        np.ndarray: The tfidf of each word
+    """
+    import numpy as np
+
+    log2 = np.frompyfunc(math.log2, 1, 1)
+
+    frequencies, frequencies_inverse = np.unique(
+        document_frequency, return_inverse=True
+    )
+    positive_frequencies = np.maximum(frequencies, 1)
+    term_frequency = (1 + log2(positive_frequencies).astype(float))[
+        frequencies_inverse
+    ]
+
+    terms, terms_inverse = np.unique(number_of_terms, return_inverse=True)
+    inverse_document_frequency = log2(number_of_documents / terms).astype(float)[
+        terms_inverse
+    ]
+
+    tf_idf = term_frequency * inverse_document_frequency
+    tf_idf[np.asarray(document_frequency) == 0] = 0
+    return tf_idf
+
+
+def get_document_norms_path(model_path: str) -> str:
+    """Get the path of the document norms persisted alongside a model
+
+    Args:
+        model_path (str): The path of the tfidf model
+
+    Returns:
+        str: The path of the document norms
+    """
+    return model_path.replace(".csv", "_norms.csv")
+
+
+def get_stemmer_file_path(file_path: str, stemmer: bool) -> str:
+    """Get the path of a file generated with or without the stemmer
+
+    Args:
+        file_path (str): The configured file path
+        stemmer (bool): If the stemmer is used
+
+    Returns:
+        str: The file path with the stemmer suffix
+    """
+    root, extension = os.path.splitext(file_path)
+    suffix = "_stemmer" if stemmer else "_nostemmer"
+    return f"{root}{suffix}{extension}"
@@ -0,0 +1,139 @@
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+
+def get_relevance_judgments(expected_results: pd.DataFrame) -> pd.DataFrame:
+    """Gets the graded relevance of each judged document
+
+    Args:
+        expected_results (pd.DataFrame): The NUMBER, DOCNUMBER and DOCVOTES of
+            esperados.csv
+
+    Returns:
+        pd.DataFrame: The QUERY, DOCUMENT and GAIN, the votes, of every document
+            with any vote. A document judged twice keeps its highest votes.
+    """
+    judgments = expected_results.loc[
+        expected_results["DOCVOTES"] > 0, ["NUMBER", "DOCNUMBER", "DOCVOTES"]
+    ]
+    judgments = judgments.rename(
+        columns={"NUMBER": "QUERY", "DOCNUMBER": "DOCUMENT", "DOCVOTES": "GAIN"}
+    )
+    return judgments.groupby(["QUERY", "DOCUMENT"], as_index=False, sort=False)[
+        "GAIN"
+    ].max()
+
+
+def calculate_discounts(positions: np.ndarray) -> np.ndarray:
+    """Calculates the logarithmic discount of each rank position
+
+    Args:
+        positions (np.ndarray): The 1 based positions
+
+    Returns:
+        np.ndarray: 1 / log2(position + 1)
+    """
+    return 1 / np.log2(positions + 1)
+
+
+def calculate_ranking_metrics(
+    results: pd.DataFrame,
+    expected_results: pd.DataFrame,
+    ndcg_cutoff: int = 10,
+    precision_cutoffs: Iterable[int] = (5, 10),
+) -> pd.DataFrame:
+    """Calculates the rank aware metrics of every query in one pass
+
+    Only the documents with a non zero score count as retrieved, so a top k
+    search and a full ranking give the same metrics up to k. The relevant
+    documents of a query are the ones with any vote, and nDCG uses the
+    votes as the graded gain.
+
+    Args:
+        results (pd.DataFrame): The QUERY, RANK, DOCUMENT and SCORE of each
+            ranked document, as read by SearchResultReader
+        expected_results (pd.DataFrame): The NUMBER, DOCNUMBER and DOCVOTES of
+            esperados.csv
+        ndcg_cutoff (int): The depth of the nDCG. Default: 10
+        precision_cutoffs (Iterable[int]): The depths of the precision. Default: (5, 10)
+
+    Returns:
+        pd.DataFrame: The P@k, R-Precision, AP, nDCG@k and RR of each judged query,
+            indexed by QUERY
+    """
+    judgments = get_relevance_judgments(expected_results)
+    queries = pd.Index(expected_results["NUMBER"].unique(), name="QUERY")
+    relevant_counts = (
+        judgments.groupby("QUERY").size().reindex(queries, fill_value=0).to_numpy()
+    )
+
+    retrieved = results.loc[results["SCORE"] > 0, ["QUERY", "RANK", "DOCUMENT"]]
+    retrieved = retrieved.sort_values(["QUERY", "RANK"], kind="stable")
+    retrieved = retrieved.merge(
+        judgments, on=["QUERY", "DOCUMENT"], how="left", sort=False
+    )
+    retrieved = retrieved.loc[retrieved["QUERY"].isin(queries)]
+
+    query_positions = queries.get_indexer(retrieved["QUERY"])
+    gains = retrieved["GAIN"].fillna(0).to_numpy(dtype=float)
+    relevant = gains > 0
+    positions = retrieved.groupby("QUERY", sort=False).cumcount().to_numpy() + 1
+    relevant_found = (
+        pd.Series(relevant).groupby(query_positions).cumsum().to_numpy(dtype=float)
+    )
+    query_relevant_counts = relevant_counts[query_positions]
+
+    def sum_by_query(values: np.ndarray) -> np.ndarray:
+        return np.bincount(query_positions, weights=values, minlength=len(queries))
+
+    def divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        return np.divide(
+            numerator,
+            denominator,
+            out=np.zeros(len(queries)),
+            where=denominator > 0,
+        )
+
+    metrics = {}
+    for cutoff in precision_cutoffs:
+        metrics[f"P@{cutoff}"] = sum_by_query(relevant & (positions <= cutoff)) / cutoff
+    metrics["R-Precision"] = divide(
+        sum_by_query(relevant & (positions <= query_relevant_counts)),
+        relevant_counts.astype(float),
+    )
+    metrics["AP"] = divide(
+        sum_by_query(np.where(relevant, relevant_found / positions, 0)),
+        relevant_counts.astype(float),
+    )
+
+    discounts = calculate_discounts(positions)
+    dcg = sum_by_query(np.where(positions <= ndcg_cutoff, gains * discounts, 0))
+    ideal = judgments.sort_values(["QUERY", "GAIN"], ascending=[True, False])
+    ideal_positions = ideal.groupby("QUERY").cumcount().to_numpy() + 1
+    ideal_gains = np.where(
+        ideal_positions <= ndcg_cutoff,
+        ideal["GAIN"].to_numpy(dtype=float) * calculate_discounts(ideal_positions),
+        0,
+    )
+    ideal_dcg = np.bincount(
+        queries.get_indexer(ideal["QUERY"]), weights=ideal_gains, minlength=len(queries)
+    )
+    metrics[f"nDCG@{ndcg_cutoff}"] = divide(dcg, ideal_dcg)
+
+    first_relevant = relevant & (relevant_found == 1)
+    metrics["RR"] = sum_by_query(np.where(first_relevant, 1 / positions, 0))
+    return pd.DataFrame(metrics, index=queries)
+
+
+def summarize_ranking_metrics(metrics: pd.DataFrame) -> pd.Series:
+    """Averages the metrics over the queries: MAP and MRR are the mean AP and RR
+
+    Args:
+        metrics (pd.DataFrame): The metrics of each query
+
+    Returns:
+        pd.Series: The mean of each metric
+    """
+    summary = metrics.mean()
+    return summary.rename({"AP": "MAP", "RR": "MRR"})
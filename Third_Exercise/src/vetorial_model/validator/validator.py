@@ -1,25 +1,37 @@
-import ast
-from typing import Dict, Set
+import numpy as np
 import pandas as pd
 
+from vetorial_model.processor.reader.search_result_reader import SearchResultReader
 from vetorial_model.utils.logger_utils import get_logger_with_date_output
-from vetorial_model.utils.math_utils import f1_score, precision, recall
+from vetorial_model.validator.metrics import (
+    calculate_ranking_metrics,
+    summarize_ranking_metrics,
+)
+
+# The documents of a search result only count as retrieved above this score
+RESULT_THRESHOLD = 0.0001
 
 
 class Validator:
     def __init__(self, results_path: str, expected_results_path: str, stemmer: bool):
         self.results_path = results_path
-        self.results = self.__read(results_path)
+        self.results = SearchResultReader(results_path).read()
         self.expected_results_path = expected_results_path
         self.expected_results = self.__read(expected_results_path)
         if stemmer:
             output_path = "Avalia/results.csv".replace(".csv", "_stemmer.csv")
             report_path = "Avalia/report.md".replace(".md", "_stemmer.md")
+            metrics_path = "Avalia/metrics.csv".replace(".csv", "_stemmer.csv")
+            metrics_report_path = "Avalia/metrics.md".replace(".md", "_stemmer.md")
         else:
             output_path = "Avalia/results.csv".replace(".csv", "_nostemmer.csv")
             report_path = "Avalia/report.md".replace(".md", "_nostemmer.md")
+            metrics_path = "Avalia/metrics.csv".replace(".csv", "_nostemmer.csv")
+            metrics_report_path = "Avalia/metrics.md".replace(".md", "_nostemmer.md")
         self.output = output_path
         self.report = report_path
+        self.metrics_output = metrics_path
+        self.metrics_report = metrics_report_path
         self.logger = get_logger_with_date_output("Validator")
 
     @staticmethod
@@ -36,77 +48,94 @@ class Validator:
         results = pd.read_csv(path, sep=";", header=0)
         return results
 
-    def change_expected_results_format(self):
-        """Changes the expected results format"""
-        expected_results = pd.DataFrame(columns=["Query", "Ranking"])
-
-        for query_number in self.expected_results["NUMBER"].unique():
-            query_df = self.expected_results.loc[
-                self.expected_results["NUMBER"] == query_number
-            ].iloc[:, 1:]
-            result_tuples = []
-            rank = 0
-            for doc, score in query_df.sort_values(
-                "DOCVOTES", ascending=False
-            ).itertuples(False, None):
-                rank += 1
-                result_tuples.append((rank, doc, score))
-
-            expected_results = pd.concat(
-                [
-                    expected_results,
-                    pd.DataFrame(
-                        [(query_number, result_tuples)],
-                        columns=["Query", "Ranking"],
-                    ),
-                ]
-            )
-
-        self.expected_results = expected_results
-        
-    def filter_documents(
-        self, results_df: pd.DataFrame, threshold: float, evaluate: bool
-    ) -> Set:
-        """Filters documents based on threshold
+    def get_retrieved_documents(self) -> pd.DataFrame:
+        """Gets the documents retrieved for each query, above the result threshold
+
+        Returns:
+            pd.DataFrame: One row per Query and DOCUMENT retrieved
+        """
+        retrieved = self.results.loc[
+            self.results["SCORE"] > RESULT_THRESHOLD, ["QUERY", "DOCUMENT"]
+        ]
+        return retrieved.rename(columns={"QUERY": "Query"}).drop_duplicates()
+
+    def get_expected_documents(self) -> pd.DataFrame:
+        """Gets the relevant documents of each query, the ones with any vote
+
+        Returns:
+            pd.DataFrame: One row per Query and DOCUMENT expected
+        """
+        expected = self.expected_results.loc[self.expected_results["DOCVOTES"] > 0]
+        expected = expected[["NUMBER", "DOCNUMBER"]].drop_duplicates()
+        return expected.rename(columns={"NUMBER": "Query", "DOCNUMBER": "DOCUMENT"})
+
+    def calculate_scores(self) -> pd.DataFrame:
+        """Calculates the precision, recall and F1 of every query at once
+
+        Both document sets are grouped by query once, and the queries without
+        retrieved or expected documents score 0.
 
-        Args:
-            results_df (pd.DataFrame): Dataframe with documents
-            threshold (float): Threshold to filter documents
-            evaluate (bool): Parses the string list to a list of values
         Returns:
-            Set: Set of documents filtered
+            pd.DataFrame: The Query, Precision, Recall and F1 of each expected query
         """
+        queries = pd.Index(self.expected_results["NUMBER"].unique(), name="Query")
+        retrieved = self.get_retrieved_documents()
+        expected = self.get_expected_documents()
+        found = retrieved.merge(expected, on=["Query", "DOCUMENT"])
+
+        def count_by_query(documents: pd.DataFrame) -> np.ndarray:
+            counts = documents.groupby("Query").size()
+            return counts.reindex(queries, fill_value=0).to_numpy(dtype=float)
+
+        retrieved_counts = count_by_query(retrieved)
+        expected_counts = count_by_query(expected)
+        found_counts = count_by_query(found)
+
+        precision = self.__divide(found_counts, retrieved_counts) * 100
+        recall = self.__divide(found_counts, expected_counts) * 100
+        precision_ratio = precision / 100
+        recall_ratio = recall / 100
+        f1 = (
+            self.__divide(2 * precision_ratio * recall_ratio, precision_ratio + recall_ratio)
+            * 100
+        )
+
+        return pd.DataFrame(
+            {
+                "Query": queries.to_numpy(dtype=float),
+                "Precision": precision,
+                "Recall": recall,
+                "F1": f1,
+            }
+        )
 
-        filtered_documents = set()
-        for result in results_df["Ranking"].values:
-            if evaluate:
-                result = ast.literal_eval(result)
-            for _, document, score in result:
-                if score > threshold:
-                    filtered_documents.add(int(document))
-        return filtered_documents
+    @staticmethod
+    def __divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        """Divides element wise, with 0 where the denominator is not positive
 
-    def save_results(self, results: Dict[int, Dict[str, float]]):
+        Args:
+            numerator (np.ndarray): The numerator
+            denominator (np.ndarray): The denominator
+
+        Returns:
+            np.ndarray: The quotient
+        """
+        return np.divide(
+            numerator,
+            denominator,
+            out=np.zeros_like(numerator),
+            where=denominator > 0,
+        )
+
+    def save_results(self, results: pd.DataFrame):
         """Saves the results
 
         Args:
-            results (Dict[int, Dict[str, float]]): Dictionary with results
+            results (pd.DataFrame): The Query, Precision, Recall and F1 of each query
         """
 
         self.logger.info("Saving results")
-        df = pd.DataFrame(columns=["Query", "Precision", "Recall", "F1"])
-        for query, result in results.items():
-            df = df.append(
-                {
-                    "Query": query,
-                    "Precision": result["Precision"],
-                    "Recall": result["Recall"],
-                    "F1": result["F1"],
-                },
-                ignore_index=True,
-            )
-
-        df.to_csv(self.output, sep=";", index=False)
+        results.to_csv(self.output, sep=";", index=False)
 
     def generate_report(self):
         """Generates a report"""
@@ -114,33 +143,29 @@ class Validator:
         df = pd.read_csv(self.output, sep=";", header=0)
         df.to_markdown(self.report, index=False)
 
+    def save_ranking_metrics(self, metrics: pd.DataFrame):
+        """Saves the ranking metrics of each query and a report with their means
+
+        Args:
+            metrics (pd.DataFrame): The ranking metrics of each query
+        """
+        self.logger.info("Saving ranking metrics")
+        metrics.to_csv(self.metrics_output, sep=";")
+        summary = summarize_ranking_metrics(metrics)
+        with open(self.metrics_report, "w", encoding="utf-8") as file:
+            file.write(summary.to_frame("Mean").to_markdown())
+            file.write("\n\n")
+            file.write(metrics.to_markdown())
+        self.logger.info(
+            "Mean metrics: %s",
+            ", ".join(f"{metric} {value:.4f}" for metric, value in summary.items()),
+        )
+
     def validate(self):
         """Validates the results"""
-        self.change_expected_results_format()
         self.logger.info("Comparing results")
-        results = {}
-
-        for query in self.expected_results["Query"].unique():
-            results[query] = {}
-            results_df = self.results.loc[self.results["Query"] == query]
-            expected_results_df = self.expected_results.loc[
-                self.expected_results["Query"] == query
-            ]
-            self.logger.info(f"Comparing query {query}")
-            documents = self.filter_documents(
-                results_df, threshold=0.0001, evaluate=True
-            )
-            expected_documents = self.filter_documents(
-                expected_results_df, threshold=0, evaluate=False
-            )
-
-            results[query]["Precision"] = precision(documents, expected_documents)
-
-            results[query]["Recall"] = recall(documents, expected_documents)
-
-            results[query]["F1"] = f1_score(
-                results[query]["Precision"] / 100, results[query]["Recall"] / 100
-            )
-
-        self.save_results(results)
+        self.save_results(self.calculate_scores())
         self.generate_report()
+        self.save_ranking_metrics(
+            calculate_ranking_metrics(self.results, self.expected_results)
+        )
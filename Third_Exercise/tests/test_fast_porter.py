@@ -0,0 +1,157 @@
+import os
+import random
+import sys
+import unittest
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+sys.path.insert(0, SOURCE_DIRECTORY)
+
+from vetorial_model.stemmer.fast_porter import (  # noqa: E402
+    STEP2_RULES,
+    STEP3_RULES,
+    STEP4_RULES,
+    stem_word,
+)
+from vetorial_model.stemmer.porter import PorterStemmer  # noqa: E402
+
+VOCABULARY_FILE = os.path.join(
+    os.path.dirname(SOURCE_DIRECTORY), "Results", "invertida_nostemmer.csv"
+)
+
+# The examples of the steps of the Porter paper, stemmed by the whole algorithm
+GOLDEN_STEMS = {
+    "caresses": "caress",
+    "ponies": "poni",
+    "ties": "ti",
+    "cats": "cat",
+    "feed": "feed",
+    "agreed": "agre",
+    "plastered": "plaster",
+    "bled": "bled",
+    "motoring": "motor",
+    "sing": "sing",
+    "conflated": "conflat",
+    "troubled": "troubl",
+    "sized": "size",
+    "hopping": "hop",
+    "tanned": "tan",
+    "fizzed": "fizz",
+    "falling": "fall",
+    "hissing": "hiss",
+    "filing": "file",
+    "happy": "happi",
+    "sky": "sky",
+    "relational": "relat",
+    "conditional": "condit",
+    "rational": "ration",
+    "digitizer": "digit",
+    "conformabli": "conform",
+    "vietnamization": "vietnam",
+    "decisiveness": "decis",
+    "hopefulness": "hope",
+    "sensibiliti": "sensibl",
+    "triplicate": "triplic",
+    "formative": "form",
+    "electrical": "electr",
+    "goodness": "good",
+    "allowance": "allow",
+    "airliner": "airlin",
+    "adjustable": "adjust",
+    "replacement": "replac",
+    "adoption": "adopt",
+    "communism": "commun",
+    "effective": "effect",
+    "bowdlerize": "bowdler",
+    "probate": "probat",
+    "rate": "rate",
+    "cease": "ceas",
+    "controll": "control",
+    "roll": "roll",
+    "generalizations": "gener",
+    "oscillators": "oscil",
+}
+
+# The suffixes of the first steps and of every rule, chained to build words
+# that go through many steps
+STEP1_SUFFIXES = ("sses", "ies", "ss", "s", "eed", "ed", "ing", "y", "e", "ll")
+STEP1B_SUFFIXES = ("at", "bl", "iz", "sion", "tion")
+SUFFIXES = sorted(
+    {
+        suffix
+        for rules in (STEP2_RULES, STEP3_RULES)
+        for group in rules.values()
+        for suffix, _ in group
+    }
+    | {suffix for group in STEP4_RULES.values() for suffix in group}
+    | set(STEP1_SUFFIXES + STEP1B_SUFFIXES)
+)
+
+
+def stem_with_original(word: str) -> str:
+    """Stem a word with the original Porter stemmer
+
+    Args:
+        word (str): The word
+
+    Returns:
+        str: The stemmed word
+    """
+    return PorterStemmer().stem(word, 0, len(word) - 1)
+
+
+def generate_words(size: int, seed: int = 0) -> list:
+    """Generate random stems, half with a doubled last letter, followed by up
+    to three rule suffixes
+
+    Args:
+        size (int): How many words are generated
+        seed (int): The seed of the random generator. Default: 0
+
+    Returns:
+        list: The words
+    """
+    generator = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz" + "aeiouy"
+    words = []
+    for _ in range(size):
+        stem = "".join(
+            generator.choice(letters) for _ in range(generator.randint(1, 7))
+        )
+        if generator.random() < 0.5:
+            stem += stem[-1]
+        suffixes = (generator.choice(SUFFIXES) for _ in range(generator.randint(0, 3)))
+        words.append(stem + "".join(suffixes))
+    return words
+
+
+class FastPorterTest(unittest.TestCase):
+    def assert_same_stems(self, words: list):
+        mismatches = [
+            (word, stem_with_original(word), stem_word(word))
+            for word in words
+            if stem_with_original(word) != stem_word(word)
+        ]
+        self.assertEqual(mismatches, [])
+
+    def test_golden_stems(self):
+        for word, stem in GOLDEN_STEMS.items():
+            with self.subTest(word=word):
+                self.assertEqual(stem_word(word), stem)
+                self.assertEqual(stem_with_original(word), stem)
+
+    def test_short_words_are_kept(self):
+        for word in ("a", "is", "as"):
+            self.assertEqual(stem_word(word), word)
+
+    def test_collection_vocabulary_matches_original(self):
+        with open(VOCABULARY_FILE, "r", encoding="utf-8") as file:
+            next(file)
+            words = [line.split(";", 1)[0] for line in file]
+        self.assert_same_stems(words)
+
+    def test_generated_words_match_original(self):
+        self.assert_same_stems(generate_words(50000))
+
+
+if __name__ == "__main__":
+    unittest.main()